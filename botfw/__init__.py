@@ -9,6 +9,8 @@ from .base.order import (  # noqa: F401
 
 from .base.trade import test_trade                          # noqa: F401
 from .base.orderbook import test_orderbook                  # noqa: F401
+from .base.websocket import (  # noqa: F401
+    setup_event_loops, run_coroutine)
 
 from .bitbank.exchange import Bitbank                       # noqa: F401
 from .bitflyer.exchange import Bitflyer                     # noqa: F401
@@ -19,6 +21,10 @@ from .gmocoin.exchange import Gmocoin                       # noqa: F401
 from .liquid.exchange import Liquid                         # noqa: F401
 
 from .etc.util import setup_logger                          # noqa: F401
+from .etc.callback import (                                 # noqa: F401
+    AsyncCallback, ConflatedCallback, BLOCK, DROP_OLDEST, CONFLATE)
 from .etc.cmd import Cmd, CmdClient, CmdServer              # noqa: F401
+from .etc.consolidated_orderbook import ConsolidatedOrderbook  # noqa: F401
+from .etc.latency import latency_report                     # noqa: F401
 from .etc.loader import DynamicThreadClassLoader, Loadable  # noqa: F401
 from .etc.trade_proxy import TradeProxy                     # noqa: F401
@@ -0,0 +1,86 @@
+import collections
+import traceback
+
+# sequence of diff ids
+CONTIGUOUS = 'contiguous'  # no id is skipped, gaps are detected (Binance)
+MONOTONIC = 'monotonic'  # ids never decrease (Bybit, bitbank)
+
+
+class DepthSync:
+    '''
+    Keep an incremental orderbook consistent with its snapshot.
+    Diffs are buffered until a snapshot is applied, diffs included in the
+    snapshot are dropped and a gap of ids resyncs only the orderbook.
+    The orderbook implements _diff_ids(diff) -> (first, last, prev),
+    _apply_diff(diff) and _resync() which requests a new snapshot.
+    '''
+
+    def __init__(self, ob, mode=CONTIGUOUS, maxlen=10000):
+        self.ob = ob
+        self.log = ob.log
+        self.mode = mode
+        self.synced = False
+        self.last_id = None  # id of the last applied diff or snapshot
+        self.resync_count = 0
+        self.__first = False  # next diff is the first one after snapshot
+        self.__buffer = collections.deque(maxlen=maxlen)
+
+    def reset(self):
+        self.synced = False
+        self.last_id = None
+        self.__buffer.clear()
+
+    def resync(self):
+        self.log.warning('orderbook is out of sync')
+        self.reset()
+        self.resync_count += 1
+        self.ob._resync()
+
+    def on_snapshot(self, last_id, apply):
+        # apply(): replace the book with the snapshot
+        # return False if the snapshot is older than the book
+        if self.synced and last_id < self.last_id:
+            return False
+        apply()
+        self.last_id = last_id
+        self.synced = True
+        self.__first = True
+        buffer = list(self.__buffer)
+        self.__buffer.clear()
+        for diff in buffer:
+            if not self.synced:
+                break
+            self.__apply(diff)
+        return True
+
+    def on_diff(self, diff):
+        # return True if diff is applied to the book
+        if not self.synced:
+            self.__buffer.append(diff)
+            return False
+        return self.__apply(diff)
+
+    def __apply(self, diff):
+        first, last, prev = self.ob._diff_ids(diff)
+        if last < self.last_id or last == self.last_id and (
+                self.__first or self.mode == CONTIGUOUS):
+            return False  # already included in the book
+
+        if self.mode == CONTIGUOUS:
+            if self.__first or prev is None:
+                gap = first > self.last_id + 1
+            else:
+                gap = prev != self.last_id
+            if gap:
+                self.resync()
+                return False
+
+        try:
+            self.ob._apply_diff(diff)
+        except Exception:  # e.g. update of unknown level
+            self.log.error(traceback.format_exc())
+            self.resync()
+            return False
+        self.last_id = last
+        self.__first = False
+        return True
@@ -3,9 +3,12 @@ import logging
 import collections
 import threading
 import traceback
+import asyncio
+import functools
 import concurrent.futures
 
 from ..etc.util import decimal_add, run_forever_nonblocking, Timer
+from ..etc.stream import CallbackStream
 
 # Order Side
 BUY = 'buy'
@@ -484,6 +487,32 @@ class OrderGroupBase:
             o, amount, price, params, self.order_log, sync)
         return o
 
+    async def create_order_async(
+            self, type_: str, side: str, amount: float, price: float = None,
+            params: dict = {}) -> Order:
+        return await self.__run_in_executor(
+            self.create_order, type_, side, amount, price, params, True)
+
+    async def cancel_order_async(self, o: Order) -> None:
+        return await self.__run_in_executor(self.cancel_order, o, True)
+
+    async def edit_order_async(
+            self, o: Order, amount: float = None, price: float = None,
+            params: dict = {}) -> Order:
+        return await self.__run_in_executor(
+            self.edit_order, o, amount, price, params, True)
+
+    async def events(self, maxlen=None):
+        # async for e in order_group.events(): ...
+        s = CallbackStream(maxlen)
+        self.add_event_callback(s.put)
+        try:
+            while True:
+                (e,) = await s.get()
+                yield e
+        finally:
+            self.remove_event_callback(s.put)
+
     def get_orders(self):
         orders = {}
         for o in list(self.manager.order_manager.orders.values()):
@@ -500,6 +529,10 @@ class OrderGroupBase:
     def remove_event_callback(self, cb):
         self.event_cb.remove(cb)
 
+    def __run_in_executor(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(None, functools.partial(func, *args))
+
     def __handle_event(self, e):
         if e.type == EVENT_EXECUTION:
             self.position_group.update(e.price, e.size, e.fee, e.info)
@@ -4,6 +4,13 @@ import logging
 from sortedcontainers import SortedDict
 
 from ..etc.util import setup_logger
+from ..etc.callback import AsyncCallback, ConflatedCallback, DROP_OLDEST
+from ..etc.stream import CallbackStream
+
+# side of level change
+BID = 0
+ASK = 1
+RESET = 2  # all levels are removed
 
 
 def test_orderbook(ob, trace=False, log_level=logging.INFO):
@@ -22,15 +29,47 @@ def test_orderbook(ob, trace=False, log_level=logging.INFO):
         pass
 
 
+class OrderbookSnapshot:
+    '''
+    Top levels of an orderbook at a version. It is never modified after
+    published, so it can be read from any thread without locks.
+    '''
+
+    def __init__(self, version, ts, bids, asks):
+        self.version = version
+        self.ts = ts
+        self.bids = bids  # ((price, size), ...)
+        self.asks = asks
+
+    @property
+    def best_bid(self):
+        return self.bids[0] if self.bids else None
+
+    @property
+    def best_ask(self):
+        return self.asks[0] if self.asks else None
+
+
 class OrderbookBase:
     def __init__(self):
         self.log = logging.getLogger(self.__class__.__name__)
         self.cb = []
+        self.bbo_cb = []
+        self.level_cb = []
+        self.best_bid = None  # (price, size), updated before callbacks
+        self.best_ask = None
+        self.array = None  # OrderbookArray (see enable_array)
+        self.version = 0  # incremented by each update
+        self.snapshot = None  # OrderbookSnapshot (see enable_snapshot)
+        self.snapshot_depth = 0
+        self.buckets = {}  # {bucket: BucketOrderbook} (see bucket_view)
+        self.__subscriptions = []  # [(ch, cb)]
         self.init()
 
     def init(self):
         self.sd_bids = SortedDict()
         self.sd_asks = SortedDict()
+        self._notify_level(RESET, 0.0, 0.0)
 
     def wait_initialized(self, timeout=60):
         ts = time.time()
@@ -54,12 +93,128 @@ class OrderbookBase:
     def asks(self):
         return self.sd_asks.values()
 
+    def enable_array(self, depth=20):
+        # keep top levels in numpy arrays for vectorized depth queries
+        from ..etc.orderbook_array import OrderbookArray  # numpy is optional
+        self.array = OrderbookArray(self, depth)
+        self.array.refresh()
+        return self.array
+
+    def enable_snapshot(self, depth=20):
+        # publish OrderbookSnapshot of top levels to self.snapshot
+        # on each update, for readers in other threads
+        self.snapshot_depth = depth
+
+    def changed_since(self, version):
+        return self.version != version
+
+    def bucket_view(self, bucket):
+        # book aggregated to price buckets, shared by all callers
+        view = self.buckets.get(bucket)
+        if not view:
+            from ..etc.orderbook_bucket import BucketOrderbook
+            view = self.buckets[bucket] = BucketOrderbook(self, bucket)
+        return view
+
+    def enable_delta_log(self, capacity=1000000, keyframe_interval=60,
+                         path=None, file_size=100 * 1024 * 1024):
+        # log level changes to reconstruct the book at any time (book_at)
+        from ..etc.orderbook_log import OrderbookDeltaLog
+        return OrderbookDeltaLog(
+            self, capacity, keyframe_interval, path, file_size)
+
+    def close(self):
+        # unsubscribe channels. websocket is kept for other subscribers
+        for ch, cb in self.__subscriptions:
+            self.ws.unsubscribe(ch, cb)
+        self.__subscriptions = []
+
     def add_callback(self, cb):
         self.cb.append(cb)
 
+    def add_async_callback(self, cb, maxlen=1000, overflow=DROP_OLDEST):
+        acb = AsyncCallback(cb, maxlen, overflow)
+        self.cb.append(acb)
+        return acb  # pass this to remove_callback()
+
+    def add_conflated_callback(self, cb, interval=0):
+        # cb(merged): latest book at most once per interval (seconds).
+        # interval 0: once per batch of frames received together
+        ccb = ConflatedCallback(cb, self.ws._loop, interval)
+        self.cb.append(ccb)
+        return ccb  # pass this to remove_callback()
+
     def remove_callback(self, cb):
         self.cb.remove(cb)
+        if isinstance(cb, (AsyncCallback, ConflatedCallback)):
+            cb.stop()
+
+    def add_bbo_callback(self, cb):
+        # cb(best_bid, best_ask): called only when best bid or ask changes
+        self.bbo_cb.append(cb)
+
+    def remove_bbo_callback(self, cb):
+        self.bbo_cb.remove(cb)
+
+    def add_level_callback(self, cb):
+        # cb(side, price, size): called for each level change applied to
+        # the book. size 0: level is removed. side RESET: book is cleared
+        self.level_cb.append(cb)
+
+    def remove_level_callback(self, cb):
+        self.level_cb.remove(cb)
+
+    async def updates(self):
+        # async for ob in orderbook.updates(): ...
+        # updates are conflated. ob is always the latest orderbook
+        s = CallbackStream(1)
+        self.add_callback(s.put)
+        try:
+            while True:
+                await s.get()
+                yield self
+        finally:
+            self.remove_callback(s.put)
+
+    def _subscribe(self, ch, cb):
+        self.ws.subscribe(ch, cb)
+        self.__subscriptions.append((ch, cb))
+
+    def _notify_level(self, side, price, size):
+        for cb in self.level_cb:
+            cb(side, price, size)
+
+    def _notify_book(self):
+        # notify all levels after the whole book is replaced
+        for cb in self.level_cb:
+            cb(RESET, 0.0, 0.0)
+            for p, s in self.bids():
+                cb(BID, p, s)
+            for p, s in self.asks():
+                cb(ASK, p, s)
 
     def _trigger_callback(self):
+        self.version += 1
+        if self.snapshot_depth:
+            self.__publish_snapshot()
+        if self.array:
+            self.array.refresh()
+        self.__update_bbo()
         for cb in self.cb:
             cb()
+
+    def __publish_snapshot(self):
+        n = self.snapshot_depth
+        self.snapshot = OrderbookSnapshot(
+            self.version, time.time(),
+            tuple(tuple(lv) for lv in self.bids()[:n]),
+            tuple(tuple(lv) for lv in self.asks()[:n]))
+
+    def __update_bbo(self):
+        bids, asks = self.bids(), self.asks()
+        bid = tuple(bids[0]) if bids else None  # copy of mutable level
+        ask = tuple(asks[0]) if asks else None
+        if bid != self.best_bid or ask != self.best_ask:
+            self.best_bid, self.best_ask = bid, ask
+            for cb in self.bbo_cb:
+                cb(bid, ask)
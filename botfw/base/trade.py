@@ -2,6 +2,8 @@ import logging
 import time
 
 from ..etc.util import setup_logger
+from ..etc.callback import AsyncCallback, DROP_OLDEST
+from ..etc.stream import CallbackStream
 
 
 def test_trade(t, trace=False, log_level=logging.INFO):
@@ -19,6 +21,9 @@ class TradeBase:
         self.log = logging.getLogger(self.__class__.__name__)
         self.ltp = None
         self.cb = []
+        self.ws = None  # set by subclass
+        self.history = None  # TradeHistory (see enable_history)
+        self.__subscriptions = []  # [(ch, cb)]
 
     def wait_initialized(self, timeout=60):
         ts = time.time()
@@ -36,12 +41,51 @@ class TradeBase:
                 return
             time.sleep(1)
 
+    def enable_history(self, capacity=100000):
+        # keep recent trades in a numpy ring for window queries.
+        # the history is shared by all users of this trade
+        if not self.history:
+            from ..etc.trade_history import TradeHistory  # numpy is optional
+            self.history = TradeHistory(capacity)
+        return self.history
+
+    def close(self):
+        # unsubscribe channels. websocket is kept for other subscribers
+        for ch, cb in self.__subscriptions:
+            self.ws.unsubscribe(ch, cb)
+        self.__subscriptions = []
+
     def add_callback(self, cb):
         self.cb.append(cb)
 
+    def add_async_callback(self, cb, maxlen=1000, overflow=DROP_OLDEST):
+        acb = AsyncCallback(cb, maxlen, overflow)
+        self.cb.append(acb)
+        return acb  # pass this to remove_callback()
+
     def remove_callback(self, cb):
         self.cb.remove(cb)
+        if isinstance(cb, AsyncCallback):
+            cb.stop()
+
+    async def stream(self, maxlen=None):
+        # async for ts, price, size in trade.stream(): ...
+        s = CallbackStream(maxlen)
+        self.add_callback(s.put)
+        try:
+            while True:
+                yield await s.get()
+        finally:
+            self.remove_callback(s.put)
+
+    def _subscribe(self, ch, cb):
+        self.ws.subscribe(ch, cb)
+        self.__subscriptions.append((ch, cb))
 
     def _trigger_callback(self, ts, price, size):
+        if self.ws:
+            self.ws._record_exchange_time(ts)
+        if self.history:
+            self.history.append(ts, price, size)
         for cb in self.cb:
             cb(ts, price, size)
@@ -4,23 +4,135 @@ import json
 import traceback
 import threading
 import asyncio
+import random
+import collections
+import zlib
+from urllib.parse import urlparse
 
 import websockets
 
+from ..etc import json_decoder
+from ..etc.latency import LatencyRecorder
 
-def new_event_loop(name):
-    loop = asyncio.new_event_loop()
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# action on channel inactivity
+RECONNECT = 'reconnect'
+RESUBSCRIBE = 'resubscribe'
+
+# connection assignment policy of EventLoopPool
+ASSIGN_EXCHANGE = 'exchange'  # connections to the same host share a loop
+ASSIGN_HASH = 'hash'  # connections are spread by hash of their key
+
+
+def new_event_loop(name, use_uvloop=False):
+    if use_uvloop and uvloop:
+        loop = uvloop.new_event_loop()
+    else:
+        loop = asyncio.new_event_loop()
     threading.Thread(
         target=lambda: loop.run_forever(),
         daemon=True, name=name).start()
     return loop
 
 
+class EventLoopPool:
+    def __init__(self, name):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.name = name
+        self.size = 1
+        self.assign = ASSIGN_EXCHANGE
+        self.use_uvloop = False
+        self.loops = []
+        self.__exchange_index = {}  # {host: loop index}
+        self.__count = 0  # number of assigned connections
+        self.__lock = threading.Lock()
+
+    def configure(self, size=1, assign=ASSIGN_EXCHANGE, use_uvloop=False):
+        if assign not in (ASSIGN_EXCHANGE, ASSIGN_HASH):
+            raise Exception(f'Unknown assignment policy: {assign}')
+        if use_uvloop and not uvloop:
+            self.log.warning('uvloop is not installed. use asyncio loop')
+        with self.__lock:
+            if size < len(self.loops):
+                raise Exception(
+                    f'{len(self.loops)} loops are already running')
+            self.size = size
+            self.assign = assign
+            self.use_uvloop = use_uvloop
+
+    def get(self, index=0):
+        with self.__lock:
+            return self.__get(index % self.size)
+
+    def assign_loop(self, ws):
+        with self.__lock:
+            host = urlparse(ws.url).netloc
+            if self.assign == ASSIGN_EXCHANGE:
+                index = self.__exchange_index.get(host)
+                if index is None:
+                    index = len(self.__exchange_index) % self.size
+                    self.__exchange_index[host] = index
+            else:
+                key = f'{ws.__class__.__name__}:{host}:{self.__count}'
+                index = zlib.crc32(key.encode()) % self.size
+            self.__count += 1
+            return self.__get(index)
+
+    def __get(self, index):
+        while len(self.loops) <= index:
+            name = f'{self.name}_{len(self.loops)}'
+            self.loops.append(new_event_loop(name, self.use_uvloop))
+        return self.loops[index]
+
+
+def setup_event_loops(size=1, assign=ASSIGN_EXCHANGE, use_uvloop=False):
+    WebsocketBase.loop_pool.configure(size, assign, use_uvloop)
+
+
+def run_coroutine(coro, loop=0):
+    # run coro on a websocket loop (index of loop_pool or event loop).
+    # callbacks of websockets on the same loop reach it without thread hop
+    if isinstance(loop, int):
+        loop = WebsocketBase.loop_pool.get(loop)
+    return asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def merge_op_message(request_table, prev, msg, max_args):
+    # merge queued {'op': 'subscribe', 'args': [...]} commands whose
+    # request table is keyed by the serialized message (bitmex, bybit).
+    # messages sent without the request table are never merged
+    prev_req = request_table.get(json.dumps(prev))
+    msg_req = request_table.get(json.dumps(msg))
+    if prev_req and msg_req and msg_req[1] is None \
+            and prev.get('op') == msg.get('op') \
+            and prev['op'] in ('subscribe', 'unsubscribe') \
+            and len(prev['args']) + len(msg['args']) <= max_args:
+        _, cb = request_table.pop(json.dumps(prev))
+        request_table.pop(json.dumps(msg), None)
+        prev['args'] += msg['args']
+        request_table[json.dumps(prev)] = (prev, cb)
+        return True
+    return False
+
+
 class WebsocketBase:
     ENDPOINT = ''
-    _loop = new_event_loop('WebsocketBase_asyncio')
-
-    def __init__(self, key=None, secret=None):
+    OFFLINE = False  # True: never connect (e.g. FrameReplayer)
+    RECONNECT_DELAY_MIN = 0.1  # first reconnect delay (seconds)
+    RECONNECT_DELAY_MAX = 30
+    RECONNECT_RESET_TIME = 60  # reset backoff if connection lasted longer
+    DEDUP_SIZE = 10000  # number of message ids kept for de-duplication
+    PING_INTERVAL = 10
+    PING_TIMEOUT = 10  # reconnect if pong does not arrive in time
+    WATCHDOG_INTERVAL = 1  # interval of channel inactivity check
+    SEND_RATE_LIMIT = None  # frames per second sent (None: unlimited)
+    loop_pool = EventLoopPool('WebsocketBase_asyncio')
+
+    def __init__(self, key=None, secret=None, loop=None):
         self.log = logging.getLogger(self.__class__.__name__)
 
         self.url = self.ENDPOINT
@@ -34,20 +146,113 @@ class WebsocketBase:
         self._ws = None
         self._request_id = 1  # next request id
         self._request_table = {}
-        self._ch_cb = {}
+        self._ch_cb = {}  # {ch: [cb]}
+        self._channels = {}  # {ch: auth}, resubscribed after reconnection
+        self._ch_alias = {}  # {key in message: subscribed channel}
+        self._recorder = None  # FrameRecorder
+        self._recorder_id = None
+
+        # loop: None(assigned by loop_pool), index of loop_pool or event loop
+        if loop is None:
+            self._loop = self.loop_pool.assign_loop(self)
+        elif isinstance(loop, int):
+            self._loop = self.loop_pool.get(loop)
+        else:
+            self._loop = loop
+
+        # latency of each channel. timestamps of the frame being handled
+        self.latency = LatencyRecorder(f'{self.log.name}@{id(self):x}')
+        self._recv_ts = 0  # time.time() at receive
+        self._recv_clock = 0  # time.perf_counter() at receive
+        self._dispatch_ch = None
+        self.__feed_recorded = False  # feed latency of the message
+
+        # redundant connections (see set_redundancy)
+        self._primary = None  # primary websocket if this is a replica
+        self._replicas = []
+        self.__dedup_set = None  # set of (ch, message id)
+        self.__dedup_queue = collections.deque()
+
+        # keepalive and channel inactivity watchdog
+        self.ping_rtt = None  # round trip time of the last ping
+        self._ch_last_recv = {}  # {ch: ts}
+        self.__inactivity = {}  # {ch: (timeout, action)}
+
+        # reconnection and data gaps caused by disconnection
+        self.reconnect_count = 0
+        self.gaps = collections.deque(maxlen=100)  # [(start_ts, end_ts)]
+        self.__close_ts = None
+
+        # outbound queue drained by a writer coroutine of each connection
+        self.__send_queue = collections.deque()  # [(msg, raw)]
+        self.__send_priority = collections.deque()  # sent first
+        self.__send_event = None
+        self.__send_pending = False  # wakeup of writer is scheduled
+        self.__loop_thread = None
 
         self.__lock = threading.Lock()
         self.__after_open_cb = []
         self.__after_auth_cb = []
+        self.__gap_cb = []
 
         if self.key and self.secret:
             self.add_after_open_callback(self._authenticate)
 
-        asyncio.run_coroutine_threadsafe(self.__worker(), WebsocketBase._loop)
+        if not self.OFFLINE:
+            asyncio.run_coroutine_threadsafe(self.__worker(), self._loop)
 
     def stop(self):
         self.running = False
-        asyncio.run_coroutine_threadsafe(self._ws.close(), WebsocketBase._loop)
+        asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        for r in self._replicas:
+            r.stop()
+
+    def reconnect(self):
+        if self._ws:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+
+    def set_inactivity_timeout(self, ch, timeout, action=RECONNECT):
+        # reconnect or resubscribe if no message arrives on ch for timeout
+        if action not in (RECONNECT, RESUBSCRIBE):
+            raise Exception(f'Unknown action: {action}')
+        if timeout:
+            self.__inactivity[ch] = (timeout, action)
+        else:
+            self.__inactivity.pop(ch, None)  # shared with replicas
+
+    def channel_idle_time(self):
+        now = time.time()
+        return {ch: now - ts for ch, ts in self._ch_last_recv.items()}
+
+    def metrics(self):
+        return {
+            'is_open': self.is_open,
+            'ping_rtt': self.ping_rtt,
+            'reconnect_count': self.reconnect_count,
+            'channel_idle_time': self.channel_idle_time(),
+            'replicas': [r.metrics() for r in self._replicas],
+        }
+
+    def set_redundancy(self, n):
+        '''
+        Keep n identical connections subscribed to the same channels and
+        deliver whichever copy of a channel message arrives first.
+        Messages of channels without _message_id() (e.g. orderbook diffs)
+        can not be told from repeated ones, so they are delivered only
+        from the first open connection (primary unless it is closed).
+        '''
+        if self._primary:
+            raise Exception('replica can not have replicas')
+        self.__dedup_set = set()
+        while len(self._replicas) < n - 1:
+            r = self._create_replica()
+            r._primary = self
+            r._ch_cb = self._ch_cb  # shared with all replicas
+            r._ch_alias = self._ch_alias
+            r.__inactivity = self.__inactivity
+            for ch, auth in list(self._channels.items()):
+                r.__add_channel(ch, auth)
+            self._replicas.append(r)
 
     def add_after_open_callback(self, cb):
         with self.__lock:
@@ -55,12 +260,20 @@ class WebsocketBase:
             if self.is_open:
                 cb()  # call immediately if already opened
 
+    def remove_after_open_callback(self, cb):
+        with self.__lock:
+            self.__after_open_cb.remove(cb)
+
     def add_after_auth_callback(self, cb):
         with self.__lock:
             self.__after_auth_cb.append(cb)
             if self.is_auth:
                 cb()  # call immediately if already authenticated
 
+    def add_gap_callback(self, cb):
+        # cb(start_ts, end_ts): called after reconnection and resubscription
+        self.__gap_cb.append(cb)
+
     def wait_open(self, timeout=10):
         ts = time.time()
         while True:
@@ -83,22 +296,44 @@ class WebsocketBase:
                 raise Exception('Auth failed')
             time.sleep(0.1)
 
-    def send_raw(self, msg):
-        asyncio.run_coroutine_threadsafe(
-            self._ws.send(msg), WebsocketBase._loop)
-        self.log.debug(f'send_raw: {msg}')
+    def set_recorder(self, recorder):
+        self._recorder_id = recorder and recorder.register(self)
+        self._recorder = recorder
+
+    def send_raw(self, msg, priority=False):
+        self.__enqueue(msg, True, priority)
 
-    def send(self, msg):
-        asyncio.run_coroutine_threadsafe(
-            self._ws.send(json.dumps(msg)), WebsocketBase._loop)
-        self.log.debug(f'send: {msg}')
+    def send(self, msg, priority=False):
+        # msg is serialized by the writer. priority: auth, order etc.
+        self.__enqueue(msg, False, priority)
 
     def subscribe(self, ch, cb, auth=False):
-        self._ch_cb[ch] = cb
-        if auth:
-            self.add_after_auth_callback(lambda: self._subscribe(ch))
-        else:
-            self.add_after_open_callback(lambda: self._subscribe(ch))
+        cbs = self._ch_cb.get(ch, [])
+        self._ch_cb[ch] = cbs + [cb]  # copy on write
+        if not cbs:
+            self.__add_channel(ch, auth)
+            for r in self._replicas:
+                r.__add_channel(ch, auth)
+
+    def unsubscribe(self, ch, cb):
+        # the channel is unsubscribed when the last subscriber leaves
+        cbs = list(self._ch_cb[ch])
+        cbs.remove(cb)
+        if cbs:
+            self._ch_cb[ch] = cbs
+            return
+        del self._ch_cb[ch]
+        self.__remove_channel(ch)
+        for r in self._replicas:
+            r.__remove_channel(ch)
+
+    def resubscribe(self, ch):
+        # subscribe again to receive the initial snapshot of ch
+        with self.__lock:
+            auth = self._channels.get(ch)
+            if auth is not None and (self.is_auth if auth else self.is_open):
+                self._unsubscribe(ch)
+                self._subscribe_channels([ch])
 
     def _set_auth_result(self, success):
         if success:
@@ -106,11 +341,53 @@ class WebsocketBase:
             with self.__lock:
                 self.is_auth = True
                 self._run_callbacks(self.__after_auth_cb)
+                self.__resubscribe(True)
         else:
             self.log.error('authentication failed')
             self.is_auth = False
             asyncio.run_coroutine_threadsafe(
-                self._ws.close(), WebsocketBase._loop)
+                self._ws.close(), self._loop)
+
+    def _dispatch(self, ch, msg):
+        self._ch_last_recv[ch] = self._recv_ts
+        p = self._primary or self
+        if p.__dedup_set is not None:  # redundant connections
+            id_ = self._message_id(ch, msg)
+            if id_ is None:
+                if self is not p.__active_connection():
+                    return
+            elif p.__is_duplicate(ch, id_):
+                return
+        if p is not self:  # replica: deliver the message as primary's one
+            p._recv_ts, p._recv_clock = self._recv_ts, self._recv_clock
+        p.__deliver(ch, msg)
+
+    def _message_id(self, ch, msg):
+        # exchange specific identity of a channel message for
+        # de-duplication. None: the channel has no identity
+        return None
+
+    def _merge_message(self, prev, msg):
+        # override to merge msg into queued prev (e.g. subscribe commands).
+        # return True if merged
+        return False
+
+    def _create_replica(self):
+        # override if __init__ of the class takes other arguments
+        if type(self).__init__ is not WebsocketBase.__init__:
+            raise Exception(
+                f'{self.__class__.__name__} does not support redundancy')
+        return self.__class__(self.key, self.secret, loop=self._loop)
+
+    def _record_exchange_time(self, ts, ch=None):
+        # ch None: recorded once per dispatched message,
+        # even if the channel has several subscribers
+        if ch is None:
+            if self.__feed_recorded:
+                return
+            self.__feed_recorded = True
+            ch = self._dispatch_ch
+        self.latency.record_feed(ch, self._recv_ts - ts)
 
     def _run_callbacks(self, cbs, *args):
         for cb in cbs:
@@ -122,6 +399,14 @@ class WebsocketBase:
     def _subscribe(self, ch):
         assert False
 
+    def _subscribe_channels(self, chs):
+        # override to subscribe multiple channels with one command
+        for ch in chs:
+            self._subscribe(ch)
+
+    def _unsubscribe(self, ch):
+        self.log.warning(f'unsubscribe is not supported: {ch}')
+
     def _authenticate(self):
         assert False
 
@@ -131,22 +416,40 @@ class WebsocketBase:
     def _on_init(self):
         pass
 
+    def _on_keepalive(self):
+        pass  # called every PING_INTERVAL, e.g. application level ping
+
     def _on_open(self):
         self.log.info(f'open websocket: {self.url}')
         self._next_id = 1
         self._request_table = {}
+        now = time.time()
+        for ch in self._channels:
+            self._ch_last_recv[ch] = now  # start of inactivity check
         with self.__lock:
             self.is_open = True
             self._run_callbacks(self.__after_open_cb)
+            self.__resubscribe(False)
+
+        if self.__close_ts:
+            gap = (self.__close_ts, time.time())
+            self.__close_ts = None
+            self.gaps.append(gap)
+            self.log.warning(f'data gap: {gap[1] - gap[0]:.3f}s')
+            self._run_callbacks(self.__gap_cb, *gap)
 
     def _on_close(self):
         self.is_open = False
         self.is_auth = None
+        if not self._primary and not any(r.is_open for r in self._replicas):
+            self.__close_ts = time.time()  # otherwise no data gap
+        self.__send_queue.clear()
+        self.__send_priority.clear()
         self.log.info('close websocket')
 
     def _on_message(self, msg):
         try:
-            msg = json.loads(msg)
+            msg = json_decoder.loads(msg)
             self._handle_message(msg)
         except Exception:
             self.log.error(traceback.format_exc())
@@ -154,28 +457,203 @@ class WebsocketBase:
     def _on_error(self, err):
         self.log.error(f'recv: {err}')
 
+    def __add_channel(self, ch, auth):
+        self._ch_last_recv.setdefault(ch, time.time())
+        with self.__lock:
+            self._channels[ch] = auth
+            if self.is_auth if auth else self.is_open:
+                self._subscribe_channels([ch])
+
+    def __enqueue(self, msg, raw, priority):
+        if self.OFFLINE:
+            return
+        if not self.is_open:
+            self.log.warning('websocket is not open. message is dropped')
+            return
+        q = self.__send_priority if priority else self.__send_queue
+        q.append((msg, raw))
+        if self.__send_pending:
+            return
+        self.__send_pending = True
+        if threading.get_ident() == self.__loop_thread:
+            self.__send_event.set()
+        else:
+            self._loop.call_soon_threadsafe(self.__send_event.set)
+
+    def __remove_channel(self, ch):
+        self._ch_last_recv.pop(ch, None)
+        with self.__lock:
+            auth = self._channels.pop(ch)
+            if self.is_auth if auth else self.is_open:
+                self._unsubscribe(ch)
+
+    def __deliver(self, ch, msg):
+        cbs = self._ch_cb.get(ch)
+        if not cbs:
+            return  # unsubscribed
+        self._dispatch_ch = ch
+        self.__feed_recorded = False
+        self._run_callbacks(cbs, msg)  # errors do not skip other subscribers
+        self.latency.record_callback(
+            ch, time.perf_counter() - self._recv_clock)
+
+    def __merge(self, prev, msg):
+        # a failed merge sends msg as it is instead of stopping the writer
+        try:
+            return self._merge_message(prev, msg)
+        except Exception:
+            self.log.error(traceback.format_exc())
+            return False
+
+    def __active_connection(self):
+        if self.is_open:
+            return self
+        for r in self._replicas:
+            if r.is_open:
+                return r
+        return self
+
+    def __is_duplicate(self, ch, id_):
+        key = (ch, id_)
+        if key in self.__dedup_set:
+            return True
+        self.__dedup_set.add(key)
+        self.__dedup_queue.append(key)
+        if len(self.__dedup_queue) > self.DEDUP_SIZE:
+            self.__dedup_set.discard(self.__dedup_queue.popleft())
+        return False
+
+    def __resubscribe(self, auth):
+        chs = [ch for ch, a in self._channels.items() if a == auth]
+        if chs:
+            try:
+                self._subscribe_channels(chs)
+            except Exception:
+                self.log.error(traceback.format_exc())
+
     async def __worker(self):
+        self.__loop_thread = threading.get_ident()
+        attempt = 0
         while True:
+            open_ts = None
             try:
                 self._on_init()
 
-                async with websockets.connect(self.url) as ws:
+                async with websockets.connect(
+                        self.url, ping_interval=None) as ws:
                     self._ws = ws
-                    self._on_open()
-                    while True:
-                        try:
-                            msg = await ws.recv()
-                            self._on_message(msg)
-                        except websockets.ConnectionClosed:
-                            break
-                        except Exception as e:
-                            self._on_error(e)
-
-                self._on_close()
+                    open_ts = time.time()
+                    self.__send_event = asyncio.Event()
+                    self.__send_pending = False
+                    tasks = [asyncio.ensure_future(self.__ping(ws)),
+                             asyncio.ensure_future(self.__watchdog()),
+                             asyncio.ensure_future(self.__writer(ws))]
+                    try:
+                        self._on_open()
+                        await self.__receive(ws)
+                    finally:
+                        for t in tasks:
+                            t.cancel()
+                        self._on_close()
             except Exception:
                 self.log.error(traceback.format_exc())
 
             self._ws = None
             if not self.running:
                 break
-            await asyncio.sleep(5)
+
+            # exponential backoff with jitter
+            if open_ts and time.time() - open_ts > self.RECONNECT_RESET_TIME:
+                attempt = 0
+            delay = min(self.RECONNECT_DELAY_MAX,
+                        self.RECONNECT_DELAY_MIN * 2 ** attempt)
+            delay *= random.uniform(0.5, 1)
+            attempt = min(attempt + 1, 16)
+            self.reconnect_count += 1
+            self.log.info(f'reconnect in {delay:.3f}s')
+            await asyncio.sleep(delay)
+
+    async def __writer(self, ws):
+        pq, q = self.__send_priority, self.__send_queue
+        interval = 1 / self.SEND_RATE_LIMIT if self.SEND_RATE_LIMIT else 0
+        last = 0  # time.monotonic() of the last frame
+        while True:
+            await self.__send_event.wait()
+            if interval:  # messages queued while waiting are merged
+                await asyncio.sleep(last + interval - time.monotonic())
+            self.__send_event.clear()
+            self.__send_pending = False
+
+            batch = []  # [(msg, raw)]
+            while pq or q:
+                msg, raw = (pq or q).popleft()
+                if batch and not raw and not batch[-1][1] \
+                        and self.__merge(batch[-1][0], msg):
+                    continue
+                batch.append((msg, raw))
+
+            debug = self.log.isEnabledFor(logging.DEBUG)
+            for msg, raw in batch:
+                data = msg if raw else json.dumps(msg)
+                if interval:
+                    await asyncio.sleep(last + interval - time.monotonic())
+                    last = time.monotonic()
+                try:
+                    await ws.send(data)
+                except websockets.ConnectionClosed:
+                    return
+                except Exception:
+                    self.log.error(traceback.format_exc())
+                if debug:
+                    self.log.debug(f'send: {data}')
+
+    async def __ping(self, ws):
+        while True:
+            await asyncio.sleep(self.PING_INTERVAL)
+            try:
+                self._on_keepalive()
+                ts = time.perf_counter()
+                pong = await ws.ping()
+                await asyncio.wait_for(pong, self.PING_TIMEOUT)
+                self.ping_rtt = time.perf_counter() - ts
+            except asyncio.TimeoutError:
+                self.log.warning('ping timeout')
+                await ws.close()
+                return
+            except websockets.ConnectionClosed:
+                return
+            except Exception:
+                self.log.error(traceback.format_exc())
+
+    async def __watchdog(self):
+        while True:
+            await asyncio.sleep(self.WATCHDOG_INTERVAL)
+            now = time.time()
+            for ch, (timeout, action) in list(self.__inactivity.items()):
+                idle = now - self._ch_last_recv.get(ch, now)
+                if idle < timeout:
+                    continue
+                self.log.warning(f'no message for {idle:.1f}s: {ch}')
+                if action == RECONNECT:
+                    self.reconnect()
+                    return
+                self._ch_last_recv[ch] = now
+                try:
+                    self.resubscribe(ch)
+                except Exception:
+                    self.log.error(traceback.format_exc())
+
+    async def __receive(self, ws):
+        while True:
+            try:
+                msg = await ws.recv()
+                self._recv_ts = time.time()
+                self._recv_clock = time.perf_counter()
+                if self._recorder:
+                    self._recorder.write(
+                        self._recorder_id, msg, self._recv_ts)
+                self._on_message(msg)
+            except websockets.ConnectionClosed:
+                break
+            except Exception as e:
+                self._on_error(e)
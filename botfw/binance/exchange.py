@@ -1,5 +1,7 @@
 from ..base.exchange import ExchangeBase
-from .websocket import BinanceWebsocket, BinanceFutureWebsocket
+from .websocket import (
+    BinanceWebsocket, BinanceFutureWebsocket,
+    BinanceWebsocketManager, BinanceFutureWebsocketManager)
 from .trade import BinanceTrade, BinanceFutureTrade
 from .orderbook import BinanceOrderbook, BinanceFutureOrderbook
 from .order import (
@@ -15,12 +17,25 @@ class Binance(ExchangeBase):
     OrderGroupManager = BinanceOrderGroupManager
     Trade = BinanceTrade
     Orderbook = BinanceOrderbook
+    WebsocketManager = BinanceWebsocketManager
 
+    def __init__(self, simulate=False):
+        super().__init__(simulate)
+        # trades and orderbooks share combined stream connections
+        self.websocket_manager = self.WebsocketManager()
 
-class BinanceFuture(ExchangeBase):
+    def create_trade(self, symbol, ws=None):
+        return super().create_trade(symbol, ws or self.websocket_manager)
+
+    def create_orderbook(self, symbol, ws=None):
+        return super().create_orderbook(symbol, ws or self.websocket_manager)
+
+
+class BinanceFuture(Binance):
     Api = BinanceFutureApi
     Websocket = BinanceFutureWebsocket
     OrderManager = BinanceFutureOrderManager
     OrderGroupManager = BinanceFutureOrderGroupManager
     Trade = BinanceFutureTrade
     Orderbook = BinanceFutureOrderbook
+    WebsocketManager = BinanceFutureWebsocketManager
@@ -1,32 +1,115 @@
-from ..base.orderbook import OrderbookBase
+import time
+import threading
+import traceback
+
+from sortedcontainers import SortedDict
+
+from ..base.orderbook import OrderbookBase, BID, ASK
+from ..base.depth_sync import DepthSync
 from .websocket import BinanceWebsocket, BinanceFutureWebsocket
 from .api import BinanceApi
 
 
 class BinanceOrderbook(OrderbookBase):
     Websocket = BinanceWebsocket
+    SNAPSHOT_METHOD = 'publicGetDepth'  # raw endpoint of ccxt
+    SNAPSHOT_LIMIT = 1000
+    SNAPSHOT_INTERVAL = 0.5  # weight 50 of 6000/minute per IP
+    __snapshot_lock = threading.Lock()  # snapshots of all books in turn
 
     def __init__(self, symbol, ws=None):
         super().__init__()
         self.symbol = symbol
-        self.ws = ws or self.Websocket()
-        self.ws.add_after_open_callback(self.init)
-        market_id = BinanceApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(f'{market_id.lower()}@depth', self.__on_message)
+        self.market_id = BinanceApi.ccxt_instance().market_id(self.symbol)
+        self.sync = DepthSync(self)
+        self.__fetching = False
+        self.__closed = False
+        ch = f'{self.market_id.lower()}@depth'
+        self.ws = (ws or self.Websocket()).connection(ch)
+        self.ws.add_after_open_callback(self.__on_open)
+        self._subscribe(ch, self.__on_message)
 
-    def __on_message(self, msg):
+    def close(self):
+        self.__closed = True
+        self.ws.remove_after_open_callback(self.__on_open)
+        super().close()
+
+    def _diff_ids(self, msg):
+        return msg['U'], msg['u'], None
+
+    def _apply_diff(self, msg):
         self.__update(self.sd_bids, msg['b'], -1)
         self.__update(self.sd_asks, msg['a'], 1)
-        self._trigger_callback()
 
-    def __update(self, sd, d, sign):
+    def _resync(self):
+        if self.ws.OFFLINE:  # replayed diffs never match a live snapshot
+            self.log.warning('snapshot is not fetched in offline mode')
+            return
+        if self.__fetching:
+            return
+        self.__fetching = True
+        threading.Thread(target=self.__fetch_snapshot, daemon=True).start()
+
+    def __on_open(self):
+        # diffs were lost while disconnected
+        self.init()
+        self.sync.reset()
+        self._resync()
+
+    def __on_message(self, msg):
+        self.ws._record_exchange_time(msg['E'] / 1000)
+        if self.sync.on_diff(msg):
+            self._trigger_callback()
+
+    def __on_snapshot(self, res):
+        def apply():
+            bids, asks = SortedDict(), SortedDict()
+            self.__update(bids, res['bids'], -1, False)
+            self.__update(asks, res['asks'], 1, False)
+            self.sd_bids, self.sd_asks = bids, asks
+            if self.level_cb:
+                self._notify_book()
+
+        if self.sync.on_snapshot(res['lastUpdateId'], apply):
+            self._trigger_callback()
+
+    def __fetch_snapshot(self):
+        # books resynced at once (e.g. reconnection of a combined stream)
+        # fetch snapshots one by one not to exceed the request weight limit
+        api = BinanceApi.ccxt_instance()
+        with BinanceOrderbook.__snapshot_lock:
+            while True:
+                if self.__closed:
+                    self.__fetching = False
+                    return
+                try:
+                    res = getattr(api, self.SNAPSHOT_METHOD)({
+                        'symbol': self.market_id,
+                        'limit': self.SNAPSHOT_LIMIT})
+                    break
+                except Exception:
+                    self.log.error(traceback.format_exc())
+                    time.sleep(5)
+            self.__fetching = False
+            # apply on the websocket thread to serialize with diffs
+            self.ws._loop.call_soon_threadsafe(self.__on_snapshot, res)
+            time.sleep(self.SNAPSHOT_INTERVAL)
+
+    def __update(self, sd, d, sign, notify=True):
+        notify = notify and self.level_cb  # False: notified as whole book
         for i in d:
             p, s = float(i[0]), float(i[1])
             if s == 0:
                 sd.pop(p * sign, None)
             else:
                 sd[p * sign] = [p, s]
+            if notify:
+                self._notify_level(BID if sign < 0 else ASK, p, s)
 
 
 class BinanceFutureOrderbook(BinanceOrderbook):
     Websocket = BinanceFutureWebsocket
+    SNAPSHOT_METHOD = 'fapiPublicGetDepth'
+
+    def _diff_ids(self, msg):
+        return msg['U'], msg['u'], msg['pu']
@@ -9,11 +9,12 @@ class BinanceTrade(TradeBase):
     def __init__(self, symbol, ws=None):
         super().__init__()
         self.symbol = symbol
-        self.ws = ws or self.Websocket()
         self.taker_buy = float('inf')
         self.taker_sell = 0.0
         market_id = BinanceApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(f'{market_id.lower()}@trade', self.__on_message)
+        ch = f'{market_id.lower()}@trade'
+        self.ws = (ws or self.Websocket()).connection(ch)
+        self._subscribe(ch, self.__on_message)
 
     def __on_message(self, msg):
         ts = msg['E'] / 1000
@@ -1,9 +1,18 @@
+import time
+import threading
+
 from ..base.websocket import WebsocketBase
 from ..etc.util import run_forever_nonblocking
 
 
 class BinanceWebsocket(WebsocketBase):
     ENDPOINT = 'wss://stream.binance.com:9443/ws'
+    MAX_SUBSCRIBE_CHANNELS = 200  # channels per SUBSCRIBE command
+    SEND_RATE_LIMIT = 4  # 5 messages/second including pong
+
+    def connection(self, ch):
+        # websocket which ch should be subscribed to (see manager below)
+        return self
 
     def command(self, op, args=None, cb=None):
         msg = {'method': op, 'id': self._request_id}
@@ -14,24 +23,51 @@ class BinanceWebsocket(WebsocketBase):
 
         self.send(msg)
 
-    def _subscribe(self, ch):
-        key = ch.split('@')
-        if len(key) < 2:
-            raise Exception('Event type is not specified')
-        symbol = key[0].upper()
-        event = 'depthUpdate' if key[1] == 'depth' else key[1]
-        self._ch_cb[(symbol, event)] = self._ch_cb[ch]
-
-        self.command('SUBSCRIBE', [ch])
+    def _subscribe_channels(self, chs):
+        for ch in chs:
+            key = ch.split('@')
+            if len(key) < 2:
+                raise Exception('Event type is not specified')
+            symbol = key[0].upper()
+            event = 'depthUpdate' if key[1] == 'depth' else key[1]
+            self._ch_alias[(symbol, event)] = ch
+
+        n = self.MAX_SUBSCRIBE_CHANNELS
+        for i in range(0, len(chs), n):
+            self.command('SUBSCRIBE', chs[i:i + n])
+
+    def _unsubscribe(self, ch):
+        for key, ch_ in list(self._ch_alias.items()):
+            if ch_ == ch:
+                del self._ch_alias[key]
+        self.command('UNSUBSCRIBE', [ch])
 
     def _authenticate(self):
         pass
 
+    def _merge_message(self, prev, msg):
+        # messages sent without the request table are never merged
+        prev_req = self._request_table.get(prev.get('id'))
+        msg_req = self._request_table.get(msg.get('id'))
+        if prev_req and prev_req[0] is prev \
+                and msg_req and msg_req[0] is msg and msg_req[1] is None \
+                and prev['method'] == msg['method'] \
+                and prev['method'] in ('SUBSCRIBE', 'UNSUBSCRIBE') \
+                and len(prev['params']) + len(msg['params']) \
+                <= self.MAX_SUBSCRIBE_CHANNELS:
+            prev['params'] += msg['params']
+            del self._request_table[msg['id']]
+            return True
+        return False
+
+    def _message_id(self, ch, msg):
+        return msg.get('u') or msg.get('t')  # depth update id or trade id
+
     def _handle_message(self, msg):
         s = msg.get('s')
         e = msg.get('e')
         if e:
-            self._ch_cb[(s, e)](msg)
+            self._dispatch(self._ch_alias[(s, e)], msg)
         else:
             self.log.debug(f'recv: {msg}')
             if 'id' in msg:
@@ -50,14 +86,80 @@ class BinanceWebsocket(WebsocketBase):
                 self.log.warning(f'Unknown message {msg}')
 
 
+class BinanceStreamWebsocket(BinanceWebsocket):
+    '''combined stream: messages are routed by stream name'''
+    ENDPOINT = 'wss://stream.binance.com:9443/stream'
+    MAX_STREAMS = 1000  # 1024 streams and 5 commands/second per connection
+
+    def _subscribe_channels(self, chs):
+        n = self.MAX_SUBSCRIBE_CHANNELS
+        for i in range(0, len(chs), n):
+            self.command('SUBSCRIBE', chs[i:i + n])
+
+    def _handle_message(self, msg):
+        stream = msg.get('stream')
+        if stream:
+            self._dispatch(stream, msg['data'])
+        else:
+            super()._handle_message(msg)
+
+
+class BinanceWebsocketManager:
+    '''
+    Pack channels of many symbols into combined stream connections.
+    Pass this as ws of Trade and Orderbook instead of a websocket.
+    '''
+    Websocket = BinanceStreamWebsocket
+    ASSIGN_TIMEOUT = 1  # seconds to wait for subscription of a channel
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.connections = []
+        self.__assigned = {}  # {ch: (websocket, ts)} not subscribed yet
+        self.__lock = threading.Lock()
+
+    def connection(self, ch):
+        # channels are looked up in the connections, so nothing is left
+        # after they are unsubscribed or the connections are stopped
+        with self.__lock:
+            now = time.time()
+            self.connections = [ws for ws in self.connections if ws.running]
+            for ws in self.connections:
+                if ch in ws._ch_cb:
+                    return ws
+
+            self.__assigned = {
+                c: (ws, ts) for c, (ws, ts) in self.__assigned.items()
+                if ws.running and c not in ws._ch_cb
+                and now - ts < self.ASSIGN_TIMEOUT}
+            if ch in self.__assigned:
+                return self.__assigned[ch][0]
+
+            n = {id(ws): len(ws._ch_cb) for ws in self.connections}
+            for ws, _ in self.__assigned.values():
+                n[id(ws)] += 1
+            for ws in self.connections:
+                if n[id(ws)] < ws.MAX_STREAMS:
+                    break
+            else:
+                ws = self.Websocket(loop=self.loop)
+                self.connections.append(ws)
+            self.__assigned[ch] = (ws, now)
+            return ws
+
+    def stop(self):
+        for ws in self.connections:
+            ws.stop()
+
+
 class BinanceWebsocketPrivate(WebsocketBase):
     ENDPOINT = 'wss://stream.binance.com:9443/ws'
 
-    def __init__(self, api):
+    def __init__(self, api, loop=None):
         self.__api = api  # _on_init() may be called in super().__init__()
         self.__cb = []
         self.__key = None  # websocket_key (listenKey)
-        super().__init__(None)
+        super().__init__(None, loop=loop)
         run_forever_nonblocking(self.__worker, self.log, 60 * 30)
 
     def add_callback(self, cb):
@@ -72,8 +174,16 @@ class BinanceWebsocketPrivate(WebsocketBase):
         super()._on_open()
         self._set_auth_result(True)
 
+    def _create_replica(self):
+        raise Exception('redundancy is not supported')
+
     def _handle_message(self, msg):
+        e = msg.get('e')
+        if 'E' in msg:
+            self._record_exchange_time(msg['E'] / 1000, e)
         self._run_callbacks(self.__cb, msg)
+        self.latency.record_callback(
+            e, time.perf_counter() - self._recv_clock)
 
     def __worker(self):
         if self.__key:
@@ -83,6 +193,17 @@ class BinanceWebsocketPrivate(WebsocketBase):
 # Future
 class BinanceFutureWebsocket(BinanceWebsocket):
     ENDPOINT = 'wss://fstream.binance.com/ws'
+    SEND_RATE_LIMIT = 8  # 10 messages/second including pong
+
+
+class BinanceFutureStreamWebsocket(BinanceStreamWebsocket):
+    ENDPOINT = 'wss://fstream.binance.com/stream'
+    MAX_STREAMS = 200
+    SEND_RATE_LIMIT = 8
+
+
+class BinanceFutureWebsocketManager(BinanceWebsocketManager):
+    Websocket = BinanceFutureStreamWebsocket
 
 
 class BinanceFutureWebsocketPrivate(BinanceWebsocketPrivate):
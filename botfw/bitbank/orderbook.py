@@ -1,6 +1,7 @@
 from sortedcontainers import SortedDict
 
-from ..base.orderbook import OrderbookBase
+from ..base.orderbook import OrderbookBase, BID, ASK
+from ..base.depth_sync import DepthSync, MONOTONIC
 from .websocket import BitbankWebsocket
 from .api import BitbankApi
 
@@ -10,32 +11,52 @@ class BitbankOrderbook(OrderbookBase):
         super().__init__()
         self.ws = ws or BitbankWebsocket()
         self.symbol = symbol
+        self.sync = DepthSync(self, MONOTONIC)  # by sequence id
 
         market_id = BitbankApi.ccxt_instance().market_id(symbol)
         self.ch_snapshot = f'depth_whole_{market_id}'
         self.ch_update = f'depth_diff_{market_id}'
-        self.ws.subscribe(self.ch_snapshot, self.__on_message)
-        self.ws.subscribe(self.ch_update, self.__on_message)
+        self._subscribe(self.ch_snapshot, self.__on_message)
+        self._subscribe(self.ch_update, self.__on_message)
 
     def __on_message(self, msg):
         d = msg['message']['data']
         ch = msg['room_name']
 
         if ch == self.ch_snapshot:
-            bids, asks = SortedDict(), SortedDict()
-            self.__update(bids, d['bids'], -1)
-            self.__update(asks, d['asks'], 1)
-            self.sd_bids, self.sd_asks = bids, asks
+            def apply():
+                bids, asks = SortedDict(), SortedDict()
+                self.__update(bids, d['bids'], -1, False)
+                self.__update(asks, d['asks'], 1, False)
+                self.sd_bids, self.sd_asks = bids, asks
+                if self.level_cb:
+                    self._notify_book()
+            if not self.sync.on_snapshot(int(d['sequenceId']), apply):
+                return
         elif ch == self.ch_update:
-            self.__update(self.sd_bids, d['b'], -1)
-            self.__update(self.sd_asks, d['a'], 1)
+            if not self.sync.on_diff(d):
+                return
 
         self._trigger_callback()
 
-    def __update(self, sd, d, sign):
+    def _diff_ids(self, d):
+        seq = int(d['s'])
+        return seq, seq, None
+
+    def _apply_diff(self, d):
+        self.__update(self.sd_bids, d['b'], -1)
+        self.__update(self.sd_asks, d['a'], 1)
+
+    def _resync(self):
+        pass  # depth_whole is pushed periodically
+
+    def __update(self, sd, d, sign, notify=True):
+        notify = notify and self.level_cb  # False: notified as whole book
         for i in d:
             p, s = float(i[0]), float(i[1])
             if s == 0:
                 sd.pop(p * sign, None)
             else:
                 sd[p * sign] = [p, s]
+            if notify:
+                self._notify_level(BID if sign < 0 else ASK, p, s)
@@ -10,7 +10,7 @@ class BitbankTrade(TradeBase):
         self.ws = ws or BitbankWebsocket()
 
         market_id = BitbankApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(f'transactions_{market_id}', self.__on_message)
+        self._subscribe(f'transactions_{market_id}', self.__on_message)
 
     def __on_message(self, msg):
         for t in msg['message']['data']['transactions']:
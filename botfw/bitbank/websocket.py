@@ -1,8 +1,7 @@
 import traceback
-import json
 
 from ..base.websocket import WebsocketBase
-from ..etc.util import run_forever_nonblocking
+from ..etc import json_decoder
 
 # engine.io-protocol
 # 0 open
@@ -23,34 +22,36 @@ from ..etc.util import run_forever_nonblocking
 
 class BitbankWebsocket(WebsocketBase):
     ENDPOINT = 'wss://stream.bitbank.cc/socket.io/?EIO=3&transport=websocket'
-
-    def __init__(self, key=None, secret=None):
-        super().__init__(key, secret)
-        run_forever_nonblocking(self.__ping_worker, self.log, 25)
+    PING_INTERVAL = 25  # engine.io pingInterval
 
     def _subscribe(self, ch):
         msg = f'42["join-room", "{ch}"]'
         self.send_raw(msg)
         self.log.info(msg)
 
+    def _unsubscribe(self, ch):
+        msg = f'42["leave-room", "{ch}"]'
+        self.send_raw(msg)
+        self.log.info(msg)
+
     def _on_message(self, msg):
-        ep = int(msg[0])  # engine.io-protocol
+        # msg is str or bytes. slice instead of index to get a digit of both
+        ep = int(msg[:1])  # engine.io-protocol
         sp = None  # socket.io-protocol
 
         if ep == 4:  # message
-            sp = int(msg[1])
+            sp = int(msg[1:2])
             content = msg[2:]
         else:
             content = msg[1:]
 
         try:
             if ep == 4 and sp == 2:
-                m = json.loads(content)[1]
+                m = json_decoder.loads(content)[1]
                 ch = m['room_name']
-                self._ch_cb[ch](m)
+                self._dispatch(ch, m)
         except Exception:
             self.log.error(traceback.format_exc())
 
-    def __ping_worker(self):
-        if self.is_open:
-            self.send_raw('2')  # ping
+    def _on_keepalive(self):
+        self.send_raw('2', True)  # engine.io ping
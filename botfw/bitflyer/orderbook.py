@@ -1,6 +1,6 @@
 from sortedcontainers import SortedDict
 
-from ..base.orderbook import OrderbookBase
+from ..base.orderbook import OrderbookBase, BID, ASK
 from .websocket import BitflyerWebsocket
 from .api import BitflyerApi
 
@@ -14,8 +14,8 @@ class BitflyerOrderbook(OrderbookBase):
         market_id = BitflyerApi.ccxt_instance().market_id(symbol)
         self.ch_snapshot = f'lightning_board_snapshot_{market_id}'
         self.ch_update = f'lightning_board_{market_id}'
-        self.ws.subscribe(self.ch_snapshot, self.__on_message)
-        self.ws.subscribe(self.ch_update, self.__on_message)
+        self._subscribe(self.ch_snapshot, self.__on_message)
+        self._subscribe(self.ch_update, self.__on_message)
 
     def __on_message(self, msg):
         p = msg['params']
@@ -23,19 +23,24 @@ class BitflyerOrderbook(OrderbookBase):
         m = p['message']
         if ch == self.ch_snapshot:
             bids, asks = SortedDict(), SortedDict()
-            self.__update(bids, m['bids'], -1)
-            self.__update(asks, m['asks'], 1)
+            self.__update(bids, m['bids'], -1, False)
+            self.__update(asks, m['asks'], 1, False)
             self.sd_bids, self.sd_asks = bids, asks
+            if self.level_cb:
+                self._notify_book()
         elif ch == self.ch_update:
             self.__update(self.sd_bids, m['bids'], -1)
             self.__update(self.sd_asks, m['asks'], 1)
 
         self._trigger_callback()
 
-    def __update(self, sd, d, sign):
+    def __update(self, sd, d, sign, notify=True):
+        notify = notify and self.level_cb  # False: notified as whole book
         for i in d:
             p, s = float(i['price']), i['size']
             if s == 0:
                 sd.pop(p * sign, None)
             else:
                 sd[p * sign] = [p, s]
+            if notify:
+                self._notify_level(BID if sign < 0 else ASK, p, s)
@@ -11,7 +11,7 @@ class BitflyerTrade(TradeBase):
         self.ws = ws or BitflyerWebsocket()
 
         market_id = BitflyerApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(
+        self._subscribe(
             f'lightning_executions_{market_id}', self.__on_message)
 
     def __on_message(self, msg):
@@ -8,18 +8,21 @@ from ..etc.util import hmac_sha256
 class BitflyerWebsocket(WebsocketBase):
     ENDPOINT = 'wss://ws.lightstream.bitflyer.com/json-rpc'
 
-    def command(self, op, args=None, cb=None):
+    def command(self, op, args=None, cb=None, priority=False):
         msg = {'method': op, 'id': self._request_id}
         if args:
             msg['params'] = args
         self._request_table[self._request_id] = (msg, cb)
         self._request_id += 1
 
-        self.send(msg)
+        self.send(msg, priority)
 
     def _subscribe(self, ch):
         self.command('subscribe', {'channel': ch})
 
+    def _unsubscribe(self, ch):
+        self.command('unsubscribe', {'channel': ch})
+
     def _authenticate(self):
         now = int(time.time())
         nonce = secrets.token_hex(16)
@@ -29,12 +32,18 @@ class BitflyerWebsocket(WebsocketBase):
             'timestamp': now,
             'nonce': nonce,
             'signature': sign},
-            lambda msg: self._set_auth_result('result' in msg))
+            lambda msg: self._set_auth_result('result' in msg), True)
+
+    def _message_id(self, ch, msg):
+        m = msg['params']['message']
+        if isinstance(m, list) and m and 'id' in m[0]:
+            return m[0]['id']  # exec id of lightning_executions
+        return None
 
     def _handle_message(self, msg):
         if msg.get('method') == 'channelMessage':
             ch = msg['params']['channel']
-            self._ch_cb[ch](msg)
+            self._dispatch(ch, msg)
         else:
             self.log.debug(f'recv: {msg}')
             if 'id' in msg:
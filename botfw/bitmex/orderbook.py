@@ -1,4 +1,4 @@
-from ..base.orderbook import OrderbookBase
+from ..base.orderbook import OrderbookBase, BID, ASK
 from .websocket import BitmexWebsocket
 from .api import BitmexApi
 
@@ -12,10 +12,11 @@ class BitmexOrderbook(OrderbookBase):
         self.ws = ws or BitmexWebsocket()
 
         market_id = BitmexApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(f'{self.CHANNEL}:{market_id}', self.__on_message)
+        self._subscribe(f'{self.CHANNEL}:{market_id}', self.__on_message)
 
     def __on_message(self, msg):
         action, data = msg['action'], msg['data']
+        notify = self.level_cb
 
         if action == 'partial':
             self.init()
@@ -24,19 +25,28 @@ class BitmexOrderbook(OrderbookBase):
             for d in data:
                 sd, key = self.__sd_and_key(d)
                 price, size = d['price'], d['size']
-                sd[key] = [price, size / price]
+                e = sd[key] = [price, size / price]
+                if notify:
+                    self.__notify(sd, e)
         elif action == 'update':
             for d in data:
                 sd, key = self.__sd_and_key(d)
                 e = sd[key]
                 e[1] = d['size'] / e[0]
+                if notify:
+                    self.__notify(sd, e)
         elif action == 'delete':
             for d in data:
                 sd, key = self.__sd_and_key(d)
-                sd.pop(key, None)
+                e = sd.pop(key, None)
+                if notify and e:
+                    self.__notify(sd, [e[0], 0.0])
 
         self._trigger_callback()
 
+    def __notify(self, sd, e):
+        self._notify_level(BID if sd is self.sd_bids else ASK, e[0], e[1])
+
     def __sd_and_key(self, data):
         if data['side'] == 'Sell':
             return self.sd_asks, -data['id']
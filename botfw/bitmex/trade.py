@@ -11,7 +11,7 @@ class BitmexTrade(TradeBase):
         self.ws = ws or BitmexWebsocket()
 
         market_id = BitmexApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(f'trade:{market_id}', self.__on_message)
+        self._subscribe(f'trade:{market_id}', self.__on_message)
 
     def __on_message(self, msg):
         if msg['action'] == 'insert':
@@ -1,42 +1,60 @@
 import time
 import json
 
-from ..base.websocket import WebsocketBase
+from ..base.websocket import WebsocketBase, merge_op_message
 from ..etc.util import hmac_sha256
 
 
 class BitmexWebsocket(WebsocketBase):
     ENDPOINT = 'wss://www.bitmex.com/realtime'
+    MAX_SUBSCRIBE_CHANNELS = 50  # channels per subscribe command
 
-    def command(self, op, args=None, cb=None):
+    def command(self, op, args=None, cb=None, priority=False):
         msg = {'op': op}
         if args:
             msg['args'] = args
         self._request_table[json.dumps(msg)] = (msg, cb)
         self._request_id += 1
 
-        self.send(msg)
+        self.send(msg, priority)
 
-    def _subscribe(self, ch):
+    def _subscribe_channels(self, chs):
+        for ch in chs:
+            if ':' in ch:
+                key = ch.split(':')[0]  # e.g. trade:XBTUSD -> trade
+                if self._ch_alias.get(key, ch) != ch:
+                    raise Exception(f'channel "{key}" is already subscribed')
+                self._ch_alias[key] = ch
+
+        n = self.MAX_SUBSCRIBE_CHANNELS
+        for i in range(0, len(chs), n):
+            self.command('subscribe', chs[i:i + n])
+
+    def _unsubscribe(self, ch):
         if ':' in ch:
-            key = ch.split(':')[0]  # e.g. trade:XBTUSD -> trade
-            if key in self._ch_cb and self._ch_cb[key] != self._ch_cb[ch]:
-                raise Exception(f'channel "{key}" is already subscribed')
-            self._ch_cb[key] = self._ch_cb[ch]
+            self._ch_alias.pop(ch.split(':')[0], None)
+        self.command('unsubscribe', [ch])
+
+    def _merge_message(self, prev, msg):
+        return merge_op_message(
+            self._request_table, prev, msg, self.MAX_SUBSCRIBE_CHANNELS)
 
-        self.command('subscribe', [ch])
+    def _message_id(self, ch, msg):
+        if ch.split(':')[0] == 'trade' and msg['action'] == 'insert':
+            return msg['data'][0]['trdMatchID']
+        return None
 
     def _authenticate(self):
         expires = int(time.time() * 1000)
         sign = hmac_sha256(self.secret, f'GET/realtime{expires}')
         self.command(
             'authKeyExpires', [self.key, expires, sign],
-            lambda msg: self._set_auth_result('success' in msg))
+            lambda msg: self._set_auth_result('success' in msg), True)
 
     def _handle_message(self, msg):
         table = msg.get('table')
         if table:
-            self._ch_cb[table](msg)
+            self._dispatch(self._ch_alias.get(table, table), msg)
         else:
             self.log.debug(f'revc: {msg}')
             if 'request' in msg:
@@ -1,4 +1,5 @@
-from ..base.orderbook import OrderbookBase
+from ..base.orderbook import OrderbookBase, BID, ASK
+from ..base.depth_sync import DepthSync, MONOTONIC
 from .websocket import BybitWebsocket, BybitUsdtWebsocket
 from .api import BybitApi
 
@@ -11,31 +12,61 @@ class BybitOrderbook(OrderbookBase):
         super().__init__()
         self.symbol = symbol
         self.ws = ws or self.Websocket()
+        self.sync = DepthSync(self, MONOTONIC)  # by cross_seq
 
         market_id = BybitApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(f'{self.CHANNEL}.{market_id}', self._on_message)
+        self.ch = f'{self.CHANNEL}.{market_id}'
+        self._subscribe(self.ch, self._on_message)
 
     def _on_message(self, msg):
         type_, data = msg['type'], msg['data']
         if type_ == 'snapshot':
-            self.init()
-            for d in data:
-                self._update(d)
+            def apply():
+                self.init()
+                for d in self._snapshot_levels(data):
+                    self._update(d)
+            if not self.sync.on_snapshot(int(msg['cross_seq']), apply):
+                return
         elif type_ == 'delta':
-            for d in data['delete']:
-                sd, key = self._sd_and_key(d)
-                del sd[key]
-            for d in data['update']:
-                self._update(d)
-            for d in data['insert']:
-                self._update(d)
+            if not self.sync.on_diff(msg):
+                return
 
         self._trigger_callback()
 
+    def _diff_ids(self, msg):
+        seq = int(msg['cross_seq'])
+        return seq, seq, None
+
+    def _apply_diff(self, msg):
+        data = msg['data']
+        for d in data['delete']:
+            self._delete(d)
+        for d in data['update']:
+            self._update(d)
+        for d in data['insert']:
+            self._update(d)
+
+    def _resync(self):
+        self.ws.resubscribe(self.ch)  # snapshot is sent after subscription
+
+    def _snapshot_levels(self, data):
+        return data
+
     def _update(self, data):
         sd, key = self._sd_and_key(data)
         price, size = float(data['price']), data['size']
-        sd[key] = [price, size / price]
+        e = sd[key] = [price, size / price]
+        if self.level_cb:
+            self._notify(sd, e)
+
+    def _delete(self, data):
+        sd, key = self._sd_and_key(data)
+        e = sd.pop(key)
+        if self.level_cb:
+            self._notify(sd, [e[0], 0.0])
+
+    def _notify(self, sd, e):
+        self._notify_level(BID if sd is self.sd_bids else ASK, e[0], e[1])
 
     def _sd_and_key(self, data):
         if data['side'] == 'Sell':
@@ -47,24 +78,12 @@ class BybitOrderbook(OrderbookBase):
 class BybitUsdtOrderbook(BybitOrderbook):
     Websocket = BybitUsdtWebsocket
 
-    def _on_message(self, msg):
-        type_, data = msg['type'], msg['data']
-        if type_ == 'snapshot':
-            self.init()
-            for d in data['order_book']:  # different from BybitOrderbook
-                self._update(d)
-        elif type_ == 'delta':
-            for d in data['delete']:
-                sd, key = self._sd_and_key(d)
-                del sd[key]
-            for d in data['update']:
-                self._update(d)
-            for d in data['insert']:
-                self._update(d)
-
-        self._trigger_callback()
+    def _snapshot_levels(self, data):
+        return data['order_book']  # different from BybitOrderbook
 
     def _update(self, data):
         sd, key = self._sd_and_key(data)
         price, size = float(data['price']), data['size']
-        sd[key] = [price, size]
+        e = sd[key] = [price, size]
+        if self.level_cb:
+            self._notify(sd, e)
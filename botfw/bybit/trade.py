@@ -13,7 +13,7 @@ class BybitTrade(TradeBase):
         self.ws = ws or self.Websocket()
 
         market_id = BybitApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(f'trade.{market_id}', self._on_message)
+        self._subscribe(f'trade.{market_id}', self._on_message)
 
     def _on_message(self, msg):
         for t in msg['data']:
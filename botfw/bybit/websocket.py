@@ -1,13 +1,14 @@
 import time
 import json
 
-from ..base.websocket import WebsocketBase
+from ..base.websocket import WebsocketBase, merge_op_message
 from ..etc.util import hmac_sha256
 
 
 class BybitWebsocket(WebsocketBase):
     ENDPOINT = 'wss://stream.bybit.com/realtime'
     ENDPOINT_PRIVATE = 'wss://stream.bybit.com/realtime'
+    MAX_SUBSCRIBE_CHANNELS = 50  # topics per subscribe command
 
     def command(self, op, args=None, cb=None):
         msg = {'op': op}
@@ -29,16 +30,30 @@ class BybitWebsocket(WebsocketBase):
         if self.key and self.secret:
             self._set_auth_result(True)
 
-    def _subscribe(self, ch):
-        self.command('subscribe', [ch])
+    def _subscribe_channels(self, chs):
+        n = self.MAX_SUBSCRIBE_CHANNELS
+        for i in range(0, len(chs), n):
+            self.command('subscribe', chs[i:i + n])
+
+    def _unsubscribe(self, ch):
+        self.command('unsubscribe', [ch])
+
+    def _merge_message(self, prev, msg):
+        return merge_op_message(
+            self._request_table, prev, msg, self.MAX_SUBSCRIBE_CHANNELS)
 
     def _authenticate(self):
         pass
 
+    def _message_id(self, ch, msg):
+        if ch.startswith('trade.'):
+            return msg['data'][0]['trade_id']
+        return None
+
     def _handle_message(self, msg):
         topic = msg.get('topic')
         if topic:
-            self._ch_cb[topic](msg)
+            self._dispatch(topic, msg)
         else:
             self.log.debug(f'recv: {msg}')
             if 'request' in msg:
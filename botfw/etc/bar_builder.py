@@ -0,0 +1,211 @@
+import time
+import logging
+import threading
+import traceback
+import collections
+
+import numpy as np
+
+# bar type: a bar is closed when interval is reached
+TIME_BAR = 'time'  # seconds. bars are aligned to multiples of interval
+TICK_BAR = 'tick'  # number of trades
+VOLUME_BAR = 'volume'  # traded size
+DOLLAR_BAR = 'dollar'  # traded value (price * size)
+
+# columns of bars
+TS = 0  # open time
+OPEN = 1
+HIGH = 2
+LOW = 3
+CLOSE = 4
+VOLUME = 5
+SIGNED_VOLUME = 6  # buy volume - sell volume
+COUNT = 7
+
+
+class Bars:
+    '''
+    OHLCV bars of a type and interval, built incrementally from trades.
+    Closed bars are kept in a float64 ring written twice like
+    TradeHistory, so the latest bars are always a contiguous view.
+    '''
+
+    def __init__(self, type_, interval, capacity=10000):
+        if type_ not in (TIME_BAR, TICK_BAR, VOLUME_BAR, DOLLAR_BAR):
+            raise Exception(f'Unknown bar type: {type_}')
+        self.type = type_
+        self.interval = interval
+        self.capacity = capacity
+        self.buf = np.zeros((capacity * 2, 8))
+        self.count = 0  # number of closed bars so far
+        self.current = None  # [ts, open, high, low, close, ...] or None
+        self.__amount = 0  # progress to interval of the current bar
+        self.__end = 0  # close time of the current time bar
+
+    def last(self, n=None):
+        # view of the latest n closed bars, oldest first
+        stored = min(self.count, self.capacity)
+        n = stored if n is None else min(n, stored)
+        end = self.count % self.capacity + self.capacity
+        return self.buf[end - n:end]
+
+    def update(self, ts, price, size):
+        # -> list of bars closed by this trade
+        closed = []
+        bar = self.current
+        if self.type == TIME_BAR and bar and ts >= self.__end:
+            closed.append(self.__close())
+            bar = None
+
+        if bar:
+            if price > bar[HIGH]:
+                bar[HIGH] = price
+            elif price < bar[LOW]:
+                bar[LOW] = price
+            bar[CLOSE] = price
+            bar[VOLUME] += abs(size)
+            bar[SIGNED_VOLUME] += size
+            bar[COUNT] += 1
+        else:
+            start = ts
+            if self.type == TIME_BAR:
+                # a trade older than a bar closed by timer goes to next bar
+                start = max(ts // self.interval * self.interval, self.__end)
+                self.__end = start + self.interval
+            self.current = [start, price, price, price, price,
+                            abs(size), size, 1]
+
+        if self.type != TIME_BAR:
+            if self.type == TICK_BAR:
+                self.__amount += 1
+            elif self.type == VOLUME_BAR:
+                self.__amount += abs(size)
+            else:
+                self.__amount += abs(size) * price
+            if self.__amount >= self.interval:
+                closed.append(self.__close())
+        return closed
+
+    def close_due(self, now):
+        # -> list of time bars whose interval ended before now
+        if self.type == TIME_BAR and self.current and now >= self.__end:
+            return [self.__close()]
+        return []
+
+    def __close(self):
+        bar = tuple(self.current)
+        i = self.count % self.capacity
+        self.buf[i] = self.buf[i + self.capacity] = bar
+        self.count += 1
+        self.current = None
+        self.__amount = 0
+        return bar
+
+
+class BarBuilder:
+    '''
+    Build bars of several types and intervals from a trade at once.
+    e.g. BarBuilder(trade, [(TIME_BAR, 60), (VOLUME_BAR, 10)])
+    Time bars are closed by a timer on the websocket loop of the trade
+    CLOSE_DELAY seconds after their end, even if no trade arrives.
+    Without a websocket (e.g. SharedTrade), call flush() periodically.
+    '''
+    CLOSE_DELAY = 1  # wait for trades delayed by the exchange (seconds)
+
+    def __init__(self, trade, specs, capacity=10000):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.trade = trade
+        self.bars = {(t, i): Bars(t, i, capacity) for t, i in specs}
+        self.cb = []
+        self.running = True
+        self.__warmup_buffer = None  # live trades received during warmup
+        self.__lock = threading.Lock()
+        trade.add_callback(self.__on_trade)
+
+        ws = trade.ws
+        if ws and any(t == TIME_BAR for t, _ in specs):
+            ws._loop.call_soon_threadsafe(self.__timer, ws._loop)
+
+    def close(self):
+        self.running = False
+        self.trade.remove_callback(self.__on_trade)
+
+    def flush(self, now=None):
+        # close time bars ended CLOSE_DELAY seconds before now
+        now = (now or time.time()) - self.CLOSE_DELAY
+        with self.__lock:
+            if self.__warmup_buffer is not None:
+                return
+            for bars in self.bars.values():
+                for bar in bars.close_due(now):
+                    self.__notify(bars, bar)
+
+    def get(self, type_, interval):
+        return self.bars[(type_, interval)]
+
+    def add_callback(self, cb):
+        # cb(bars, bar): called when a bar of bars (Bars) is closed
+        self.cb.append(cb)
+
+    def remove_callback(self, cb):
+        self.cb.remove(cb)
+
+    def warmup(self, api, symbol, since=None, limit=None):
+        # build bars from trades of REST api (api.fetch_trades of ccxt)
+        # right after creation. since: unix time in seconds.
+        # callbacks are not called for bars closed by fetched trades
+        with self.__lock:
+            self.__warmup_buffer = []
+        trades = []
+        try:
+            trades = api.fetch_trades(
+                symbol, since and int(since * 1000), limit)
+        finally:
+            with self.__lock:
+                last_ts = 0
+                last = collections.Counter()  # fetched trades of last_ts
+                for t in trades:
+                    ts = t['timestamp'] / 1000
+                    size = t['amount'] if t['side'] == 'buy' else -t['amount']
+                    self.__update(ts, t['price'], size, False)
+                    if ts != last_ts:
+                        last_ts = ts
+                        last.clear()
+                    last[(ts, t['price'], size)] += 1
+                for t in self.__warmup_buffer:
+                    # trades without id: several fills of the same time
+                    # are told apart from fetched ones by price and size
+                    if t[0] < last_ts:
+                        continue
+                    if last[t]:
+                        last[t] -= 1
+                        continue
+                    self.__update(*t)
+                self.__warmup_buffer = None
+        self.log.info(f'warmup: {len(trades)} trades')
+
+    def __on_trade(self, ts, price, size):
+        with self.__lock:
+            if self.__warmup_buffer is None:
+                self.__update(ts, price, size)
+            else:
+                self.__warmup_buffer.append((ts, price, size))
+
+    def __update(self, ts, price, size, notify=True):
+        for bars in self.bars.values():
+            for bar in bars.update(ts, price, size):
+                if notify:
+                    self.__notify(bars, bar)
+
+    def __notify(self, bars, bar):
+        for cb in self.cb:
+            cb(bars, bar)
+
+    def __timer(self, loop):
+        if not self.running:
+            return
+        try:
+            self.flush()
+        except Exception:
+            self.log.error(traceback.format_exc())
+        loop.call_later(1, self.__timer, loop)
@@ -0,0 +1,157 @@
+import time
+import logging
+import threading
+import collections
+import traceback
+
+# overflow policy of AsyncCallback
+BLOCK = 'block'  # wait until the queue has room (blocks the caller)
+DROP_OLDEST = 'drop_oldest'  # discard the oldest queued call
+CONFLATE = 'conflate'  # replace the newest queued call with the latest one
+
+
+class AsyncCallback:
+    '''
+    Callable wrapper which delivers calls to "cb" in its own thread.
+    It can be passed wherever a callback is accepted
+    (e.g. Trade.add_callback, Websocket.subscribe), so the caller
+    (websocket thread) never waits for user code unless overflow is BLOCK.
+    '''
+
+    def __init__(self, cb, maxlen=1000, overflow=DROP_OLDEST):
+        if overflow not in (BLOCK, DROP_OLDEST, CONFLATE):
+            raise Exception(f'Unknown overflow policy: {overflow}')
+        name = getattr(cb, '__name__', cb.__class__.__name__)
+        self.log = logging.getLogger(f'{self.__class__.__name__}({name})')
+        self.cb = cb
+        self.maxlen = maxlen
+        self.overflow = overflow
+        self.running = True
+
+        self.queue = collections.deque()  # [args]
+        self.max_depth = 0
+        self.delivered = 0
+        self.dropped = 0    # discarded by DROP_OLDEST
+        self.conflated = 0  # replaced by CONFLATE
+        self.blocked = 0    # number of calls which waited by BLOCK
+
+        self.__cond = threading.Condition()
+        self.__thread = threading.Thread(
+            name=self.log.name, target=self.__worker, daemon=True)
+        self.__thread.start()
+
+    def __call__(self, *args):
+        with self.__cond:
+            q = self.queue
+            if len(q) >= self.maxlen:
+                if self.overflow == DROP_OLDEST:
+                    q.popleft()
+                    self.dropped += 1
+                elif self.overflow == CONFLATE:
+                    q[-1] = args
+                    self.conflated += 1
+                    return
+                else:  # BLOCK
+                    self.blocked += 1
+                    while len(q) >= self.maxlen and self.running:
+                        self.__cond.wait()
+
+            q.append(args)
+            if len(q) > self.max_depth:
+                self.max_depth = len(q)
+            self.__cond.notify_all()
+
+    @property
+    def depth(self):
+        return len(self.queue)
+
+    def stats(self):
+        return {
+            'depth': len(self.queue),
+            'max_depth': self.max_depth,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'blocked': self.blocked,
+        }
+
+    def stop(self):
+        with self.__cond:
+            self.running = False
+            self.__cond.notify_all()
+
+    def __worker(self):
+        q = self.queue
+        while True:
+            with self.__cond:
+                while not q and self.running:
+                    self.__cond.wait()
+                if not self.running:
+                    return
+                args = q.popleft()
+                self.__cond.notify_all()  # wake up BLOCK callers
+
+            try:
+                self.cb(*args)
+            except Exception:
+                self.log.error(traceback.format_exc())
+            self.delivered += 1
+
+
+class ConflatedCallback:
+    '''
+    Callable wrapper which merges calls and delivers them to cb(merged)
+    on an event loop, at most once per interval (seconds). interval 0
+    delivers once per batch of calls made in the same loop iteration
+    (e.g. frames received together). merged is the number of calls.
+    '''
+
+    def __init__(self, cb, loop, interval=0):
+        name = getattr(cb, '__name__', cb.__class__.__name__)
+        self.log = logging.getLogger(f'{self.__class__.__name__}({name})')
+        self.cb = cb
+        self.loop = loop
+        self.interval = interval
+        self.running = True
+
+        self.pending = 0  # calls since the last delivery
+        self.delivered = 0
+        self.merged = 0  # total number of merged calls
+        self.__scheduled = False
+        self.__last_ts = 0  # time.monotonic() of the last delivery
+
+    def __call__(self, *args):
+        self.pending += 1
+        if not self.__scheduled:
+            self.__scheduled = True
+            self.loop.call_soon_threadsafe(self.__schedule)
+
+    def stats(self):
+        return {
+            'pending': self.pending,
+            'delivered': self.delivered,
+            'merged': self.merged,
+        }
+
+    def stop(self):
+        self.running = False
+
+    def __schedule(self):
+        delay = self.__last_ts + self.interval - time.monotonic()
+        if delay > 0:
+            self.loop.call_later(delay, self.__deliver)
+        else:
+            self.__deliver()
+
+    def __deliver(self):
+        n, self.pending = self.pending, 0
+        self.__scheduled = False
+        self.__last_ts = time.monotonic()
+        if not self.running:
+            return
+        try:
+            self.cb(n)
+        except Exception:
+            self.log.error(traceback.format_exc())
+        self.delivered += 1
+        self.merged += n - 1
@@ -0,0 +1,145 @@
+import logging
+import threading
+
+from sortedcontainers import SortedDict
+
+from ..base.orderbook import BID, ASK, RESET
+
+
+class ConsolidatedOrderbook:
+    '''
+    Merged orderbook of the same asset across venues.
+    Levels are [price, size, venue], updated incrementally from level
+    changes of each orderbook. Books which are replaced by each message
+    (e.g. Liquid, Gmocoin) are re-merged only for the venue updated.
+    '''
+
+    def __init__(self, books=None):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.cb = []
+        self.books = {}  # {venue: orderbook}
+        self.sd_bids = SortedDict()  # {(-price, venue): [price, size, venue]}
+        self.sd_asks = SortedDict()  # {(price, venue): [price, size, venue]}
+        self.__keys = {}  # {venue: ({key of sd_bids}, {key of sd_asks})}
+        self.__level_cb = {}  # {venue: level callback}
+        self.__update_cb = {}  # {venue: callback}
+        self.__lock = threading.Lock()
+        for venue, ob in (books or {}).items():
+            self.add_venue(venue, ob)
+
+    def add_venue(self, venue, ob):
+        if venue in self.books:
+            raise Exception(f'venue {venue} already exists')
+
+        def on_level(side, price, size):
+            with self.__lock:
+                self.__on_level(venue, side, price, size)
+
+        def on_update():
+            self.__trigger_callback(venue)
+
+        with self.__lock:
+            self.books[venue] = ob
+            self.__keys[venue] = (set(), set())
+            self.__level_cb[venue] = on_level
+            self.__update_cb[venue] = on_update
+            ob.add_level_callback(on_level)
+            for p, s in ob.bids():
+                self.__on_level(venue, BID, p, s)
+            for p, s in ob.asks():
+                self.__on_level(venue, ASK, p, s)
+        ob.add_callback(on_update)
+
+    def remove_venue(self, venue):
+        ob = self.books[venue]
+        ob.remove_callback(self.__update_cb.pop(venue))
+        with self.__lock:
+            ob.remove_level_callback(self.__level_cb.pop(venue))
+            self.__on_level(venue, RESET, 0.0, 0.0)
+            del self.books[venue]
+            del self.__keys[venue]
+
+    def close(self):
+        for venue in list(self.books):
+            self.remove_venue(venue)
+
+    def add_callback(self, cb):
+        # cb(venue): called after the book of venue is updated
+        self.cb.append(cb)
+
+    def remove_callback(self, cb):
+        self.cb.remove(cb)
+
+    def bids(self, n=None):
+        # copy of top n levels. n None: all levels
+        with self.__lock:
+            return [list(lv) for lv in self.sd_bids.values()[:n]]
+
+    def asks(self, n=None):
+        with self.__lock:
+            return [list(lv) for lv in self.sd_asks.values()[:n]]
+
+    @property
+    def best_bid(self):
+        # (price, size, venue) or None
+        with self.__lock:
+            return self.__best(self.sd_bids)
+
+    @property
+    def best_ask(self):
+        with self.__lock:
+            return self.__best(self.sd_asks)
+
+    def depth(self, side, price):
+        # total size of levels at price or better. -> (size, {venue: size})
+        total, venues = 0, {}
+        with self.__lock:
+            for p, s, v in self.__side(side).values():
+                if (p < price) if side == BID else (p > price):
+                    break
+                total += s
+                venues[v] = venues.get(v, 0) + s
+        return total, venues
+
+    def impact_price(self, side, size):
+        # (worst price, average price) to take size from side across venues
+        # None: not enough depth
+        remain, cost = size, 0
+        with self.__lock:
+            for p, s, _ in self.__side(side).values():
+                s = min(s, remain)
+                cost += p * s
+                remain -= s
+                if remain <= 0:
+                    return p, cost / size
+        return None
+
+    def __best(self, sd):
+        return tuple(sd.peekitem(0)[1]) if sd else None
+
+    def __side(self, side):
+        return self.sd_bids if side == BID else self.sd_asks
+
+    def __on_level(self, venue, side, price, size):
+        keys = self.__keys[venue]
+        if side == RESET:
+            for sd, ks in zip((self.sd_bids, self.sd_asks), keys):
+                for key in ks:
+                    del sd[key]
+                ks.clear()
+            return
+
+        keys = keys[side]
+        if side == BID:
+            sd, key = self.sd_bids, (-price, venue)
+        else:
+            sd, key = self.sd_asks, (price, venue)
+        if size:
+            sd[key] = [price, size, venue]
+            keys.add(key)
+        elif sd.pop(key, None):
+            keys.remove(key)
+
+    def __trigger_callback(self, venue):
+        for cb in self.cb:
+            cb(venue)
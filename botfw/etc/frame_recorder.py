@@ -0,0 +1,171 @@
+import time
+import logging
+import threading
+import struct
+import mmap
+import bisect
+import os
+import json
+
+from . import json_decoder
+
+# record: header(ts, connection id, frame type, payload size) + payload
+HEADER = struct.Struct('<dIBI')
+INDEX = struct.Struct('<dQ')  # sparse time index: (ts, file offset)
+
+# frame type
+TEXT = 0
+BINARY = 1
+CONNECTION = 2  # connection info(json), payload: {"class": ..., "url": ...}
+
+
+class FrameRecorder:
+    def __init__(self, path, index_interval=1):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.path = path
+        self.index_interval = index_interval
+        self.count = 0  # number of recorded frames
+
+        self.__file = open(path, 'ab')
+        self.__index = open(path + '.idx', 'ab')
+        self.__next_index_ts = 0
+        self.__next_id = 0
+        self.__lock = threading.Lock()
+
+    def register(self, ws):
+        with self.__lock:
+            id_ = self.__next_id
+            self.__next_id += 1
+            info = json.dumps({'class': ws.__class__.__name__, 'url': ws.url})
+            self.__write(time.time(), id_, CONNECTION, info.encode())
+        self.log.info(f'register {ws.__class__.__name__} as {id_}')
+        return id_
+
+    def write(self, id_, frame, ts=None):
+        ts = ts or time.time()
+        if isinstance(frame, str):
+            type_, frame = TEXT, frame.encode()
+        else:
+            type_ = BINARY
+        with self.__lock:
+            self.__write(ts, id_, type_, frame)
+            self.count += 1
+
+    def close(self):
+        with self.__lock:
+            self.__file.close()
+            self.__index.close()
+
+    def __write(self, ts, id_, type_, payload):
+        if ts >= self.__next_index_ts:
+            self.__index.write(INDEX.pack(ts, self.__file.tell()))
+            self.__index.flush()
+            self.__file.flush()
+            self.__next_index_ts = ts + self.index_interval
+        self.__file.write(HEADER.pack(ts, id_, type_, len(payload)))
+        self.__file.write(payload)
+
+
+class FrameReplayer:
+    def __init__(self, path):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.path = path
+        self.connections = {}  # {id: {'class': class_name, 'url': url}}
+        self.websockets = {}  # {id: ws}
+
+        self.__file = open(path, 'rb')
+        if os.path.getsize(path):
+            self.__mm = mmap.mmap(
+                self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.__mm = b''  # mmap can not map an empty file
+        self.__index_ts, self.__index_pos = [], []
+        if os.path.exists(path + '.idx'):
+            with open(path + '.idx', 'rb') as f:
+                for ts, pos in INDEX.iter_unpack(f.read()):
+                    self.__index_ts.append(ts)
+                    self.__index_pos.append(pos)
+
+        for _, id_, type_, payload in self.frames(types=(CONNECTION,)):
+            self.connections[id_] = json_decoder.loads(payload)
+
+    @staticmethod
+    def create_websocket(cls, *args, **kwargs):
+        '''create websocket of class "cls" which does not connect'''
+        offline_cls = type(cls.__name__, (cls,), {'OFFLINE': True})
+        return offline_cls(*args, **kwargs)
+
+    def attach(self, ws, id_=None):
+        '''feed frames of connection "id_" to "ws"'''
+        if id_ is None:  # first unattached connection of the same class
+            for i, info in sorted(self.connections.items()):
+                if info['class'] == ws.__class__.__name__ \
+                        and i not in self.websockets:
+                    id_ = i
+                    break
+            else:
+                raise Exception(
+                    f'no recorded connection for {ws.__class__.__name__}')
+        self.websockets[id_] = ws
+        return id_
+
+    def seek(self, ts):
+        '''return file offset of the first frame received at or after ts'''
+        i = bisect.bisect_right(self.__index_ts, ts) - 1
+        pos = self.__index_pos[i] if i >= 0 else 0
+        mm, size = self.__mm, len(self.__mm)
+        while pos < size:
+            ts_, _, _, n = HEADER.unpack_from(mm, pos)
+            if ts_ >= ts:
+                break
+            pos += HEADER.size + n
+        return pos
+
+    def frames(self, start=None, end=None, types=(TEXT, BINARY)):
+        mm, size = self.__mm, len(self.__mm)
+        pos = self.seek(start) if start else 0
+        unpack, hsize = HEADER.unpack_from, HEADER.size
+        while pos + hsize <= size:
+            ts, id_, type_, n = unpack(mm, pos)
+            if end and ts > end:
+                break
+            pos += hsize
+            if type_ in types:
+                yield ts, id_, type_, mm[pos:pos + n]
+            pos += n
+
+    def run(self, start=None, end=None, speed=None):
+        '''
+        feed frames to attached websockets in the caller thread.
+        speed: None(as fast as possible) or factor of recorded speed
+        '''
+        for ws in self.websockets.values():
+            ws._on_open()
+            if ws.is_auth is None:
+                ws._set_auth_result(True)
+
+        count = 0
+        t0 = ts0 = None
+        websockets = self.websockets
+        for ts, id_, type_, payload in self.frames(start, end):
+            ws = websockets.get(id_)
+            if not ws:
+                continue
+            if speed:
+                if ts0 is None:
+                    t0, ts0 = time.time(), ts
+                wait = (ts - ts0) / speed - (time.time() - t0)
+                if wait > 0:
+                    time.sleep(wait)
+            ws._recv_ts, ws._recv_clock = ts, time.perf_counter()
+            ws._on_message(payload)
+            count += 1
+
+        for ws in self.websockets.values():
+            ws._on_close()
+        return count
+
+    def close(self):
+        if self.__mm:
+            self.__mm.close()
+        self.__file.close()
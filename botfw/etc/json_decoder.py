@@ -0,0 +1,21 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# both decoders accept str and bytes
+BACKENDS = {'json': json.loads}
+if orjson:
+    BACKENDS['orjson'] = orjson.loads
+
+backend = 'orjson' if orjson else 'json'
+loads = BACKENDS[backend]
+
+
+def set_backend(name):
+    global backend, loads
+    if name not in BACKENDS:
+        raise Exception(f'JSON backend "{name}" is not available')
+    backend, loads = name, BACKENDS[name]
@@ -0,0 +1,136 @@
+import weakref
+
+_recorders = weakref.WeakSet()  # all LatencyRecorder instances
+
+
+class LatencyHistogram:
+    '''
+    HDR style log-linear histogram of latency in seconds.
+    Memory is fixed and relative error of values is less than 1/HALF.
+    '''
+    UNIT = 1e-6  # resolution: 1us
+    SUB_BITS = 7
+    SUB = 1 << SUB_BITS
+    HALF = SUB >> 1
+    MAX_SHIFT = 30  # max value: SUB << MAX_SHIFT us (about 38 hours)
+    SIZE = SUB + MAX_SHIFT * HALF
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.negative = 0  # number of negative values (clock skew)
+
+    def record(self, value):
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        v = int(value / self.UNIT)
+        if v < self.SUB:
+            if v < 0:
+                self.negative += 1
+                v = 0
+            self.counts[v] += 1
+        else:
+            shift = v.bit_length() - self.SUB_BITS
+            if shift > self.MAX_SHIFT:
+                self.counts[-1] += 1
+            else:
+                i = self.SUB + (shift - 1) * self.HALF \
+                    + (v >> shift) - self.HALF
+                self.counts[i] += 1
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        if p >= 100:
+            return self.max
+        target = self.count * p / 100
+        total = 0
+        for i, n in enumerate(self.counts):
+            total += n
+            if n and total >= target:
+                if i == self.SIZE - 1:  # overflow bucket
+                    return self.max
+                v = self.__value(i)
+                return min(max(v, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def summary(self, percentiles=(50, 90, 99, 99.9)):
+        s = {'count': self.count, 'mean': self.mean()}
+        if self.count:
+            s['min'], s['max'] = self.min, self.max
+        for p in percentiles:
+            s[f'p{p}'] = self.percentile(p)
+        return s
+
+    def __value(self, i):  # middle value of bucket i in seconds
+        if i < self.SUB:
+            return (i + 0.5) * self.UNIT
+        shift, m = divmod(i - self.SUB, self.HALF)
+        shift += 1
+        return (((m + self.HALF) << shift) + (1 << (shift - 1))) * self.UNIT
+
+
+class LatencyRecorder:
+    def __init__(self, name):
+        self.name = name
+        self.feed = {}  # {ch: LatencyHistogram} exchange ts -> receive
+        self.callback = {}  # {ch: LatencyHistogram} receive -> callback end
+        _recorders.add(self)
+
+    def record_feed(self, ch, latency):
+        h = self.feed.get(ch)
+        if not h:
+            h = self.feed[ch] = LatencyHistogram()
+        h.record(latency)
+
+    def record_callback(self, ch, latency):
+        h = self.callback.get(ch)
+        if not h:
+            h = self.callback[ch] = LatencyHistogram()
+        h.record(latency)
+
+    def summary(self, percentiles=(50, 90, 99, 99.9)):
+        res = {}
+        for kind, hs in (('feed', self.feed), ('callback', self.callback)):
+            for ch, h in list(hs.items()):
+                res.setdefault(ch, {})[kind] = h.summary(percentiles)
+        return res
+
+    def reset(self):
+        for h in list(self.feed.values()) + list(self.callback.values()):
+            h.reset()
+
+
+def latency_report(pattern=''):
+    '''
+    Show latency percentiles(ms) of websocket channels
+    feed: exchange timestamp -> receive, callback: receive -> callback end
+    '''
+    lines = [f'{"channel":<48}{"kind":<10}{"count":>10}'
+             f'{"p50":>10}{"p90":>10}{"p99":>10}{"p99.9":>10}{"max":>10}']
+    for r in sorted(_recorders, key=lambda r: r.name):
+        for ch, kinds in r.summary((50, 90, 99, 99.9)).items():
+            name = f'{r.name} {ch}'
+            if pattern not in name:
+                continue
+            for kind, s in kinds.items():
+                if not s['count']:
+                    continue
+                ps = ''.join(f'{s[k] * 1e3:10.3f}'
+                             for k in ('p50', 'p90', 'p99', 'p99.9', 'max'))
+                lines.append(f'{name:<48}{kind:<10}{s["count"]:>10}{ps}')
+    return '\n'.join(lines)
@@ -0,0 +1,383 @@
+import time
+import json
+import random
+import asyncio
+import logging
+import itertools
+
+import websockets
+
+from ..base.websocket import new_event_loop
+
+# protocols
+BITFLYER = 'bitflyer'
+BITMEX = 'bitmex'
+BYBIT = 'bybit'
+BINANCE = 'binance'
+BITBANK = 'bitbank'
+
+
+def iso8601z(ts):
+    us = int(ts * 1e6) % 1000000
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ts)) + f'.{us:06d}Z'
+
+
+class MockMarket:
+    '''random trades and a book of fixed levels shared by all connections'''
+
+    def __init__(self, price=10000.0, tick=1.0, depth=25):
+        self.price = price
+        self.update_id = 0  # incremented on each level update
+        self.levels = {}  # {level id: [side, price, size]}
+        for i in range(depth):
+            self.levels[i * 2] = ['Buy', price - (i + 1) * tick, self.size()]
+            self.levels[i * 2 + 1] = ['Sell', price + (i + 1) * tick,
+                                      self.size()]
+
+    def size(self):
+        return round(random.uniform(0.01, 1), 2)
+
+    def trade(self):
+        # taker buys at the best ask and sells at the best bid
+        bids, asks = self.book()
+        side = random.choice(('Buy', 'Sell'))
+        price = min(asks)[0] if side == 'Buy' else max(bids)[0]
+        return side, price, self.size()
+
+    def update(self):
+        id_ = random.choice(list(self.levels))
+        level = self.levels[id_]
+        level[2] = self.size()
+        self.update_id += 1
+        return id_, level
+
+    def book(self):
+        bids = [(p, s) for side, p, s in self.levels.values() if side == 'Buy']
+        asks = [(p, s) for side, p, s in self.levels.values() if side != 'Buy']
+        return bids, asks
+
+
+class MockProtocol:
+    def __init__(self, market, path):
+        self.market = market
+        self.path = path
+        self.seq = itertools.count(1)
+
+    def on_open(self):
+        return []  # frames sent after connection
+
+    def on_message(self, frame):
+        # -> (subscribed channels, unsubscribed channels, reply frames)
+        return [], [], []
+
+    def snapshot(self, ch):
+        return None  # frame sent after subscription
+
+    def message(self, ch):
+        assert False
+
+
+class BitflyerProtocol(MockProtocol):
+    def on_message(self, frame):
+        msg = json.loads(frame)
+        ch = msg.get('params', {}).get('channel')
+        reply = json.dumps(
+            {'jsonrpc': '2.0', 'id': msg.get('id'), 'result': True})
+        if msg['method'] == 'subscribe':
+            return [ch], [], [reply]
+        elif msg['method'] == 'unsubscribe':
+            return [], [ch], [reply]
+        return [], [], [reply]
+
+    def message(self, ch):
+        m = self.market
+        if ch.startswith('lightning_executions_'):
+            side, price, size = m.trade()
+            body = [{
+                'id': next(self.seq), 'side': side.upper(),
+                'price': price, 'size': size,
+                'exec_date': iso8601z(time.time()),
+                'buy_child_order_acceptance_id': '',
+                'sell_child_order_acceptance_id': ''}]
+        elif ch.startswith('lightning_board_snapshot_'):
+            bids, asks = m.book()
+            body = {'mid_price': m.price,
+                    'bids': [{'price': p, 'size': s} for p, s in bids],
+                    'asks': [{'price': p, 'size': s} for p, s in asks]}
+        else:
+            _, (side, price, size) = m.update()
+            level = [{'price': price, 'size': size}]
+            body = {'mid_price': m.price,
+                    'bids': level if side == 'Buy' else [],
+                    'asks': [] if side == 'Buy' else level}
+        return json.dumps({
+            'jsonrpc': '2.0', 'method': 'channelMessage',
+            'params': {'channel': ch, 'message': body}})
+
+
+class BitmexProtocol(MockProtocol):
+    @staticmethod
+    def level_id(price):
+        return 8800000000 - int(price * 100)  # decreases as price rises
+
+    def on_message(self, frame):
+        msg = json.loads(frame)
+        op, args = msg['op'], msg.get('args', [])
+        if op in ('subscribe', 'unsubscribe'):
+            replies = [json.dumps({'success': True, op: a, 'request': msg})
+                       for a in args]
+            if op == 'subscribe':
+                return args, [], replies
+            return [], args, replies
+        return [], [], [json.dumps({'success': True, 'request': msg})]
+
+    def snapshot(self, ch):
+        table, _, symbol = ch.partition(':')
+        if not table.startswith('orderBook'):
+            return None
+        data = [{'symbol': symbol, 'id': self.level_id(price), 'side': side,
+                 'size': round(size * price), 'price': price}
+                for side, price, size in self.market.levels.values()]
+        return json.dumps({'table': table, 'action': 'partial', 'data': data})
+
+    def message(self, ch):
+        table, _, symbol = ch.partition(':')
+        if table == 'trade':
+            side, price, size = self.market.trade()
+            return json.dumps({'table': table, 'action': 'insert', 'data': [{
+                'timestamp': iso8601z(time.time()), 'symbol': symbol,
+                'side': side, 'size': round(size * price), 'price': price,
+                'trdMatchID': str(next(self.seq))}]})
+        _, (side, price, size) = self.market.update()
+        return json.dumps({'table': table, 'action': 'update', 'data': [{
+            'symbol': symbol, 'id': self.level_id(price), 'side': side,
+            'size': round(size * price)}]})
+
+
+class BybitProtocol(MockProtocol):
+    def on_message(self, frame):
+        msg = json.loads(frame)
+        reply = [json.dumps({'success': True, 'ret_msg': '', 'request': msg})]
+        if msg['op'] == 'subscribe':
+            return msg['args'], [], reply
+        elif msg['op'] == 'unsubscribe':
+            return [], msg['args'], reply
+        return [], [], reply
+
+    def snapshot(self, ch):
+        if ch.startswith('trade.'):
+            return None
+        data = [self.__level(ch, level)
+                for level in self.market.levels.values()]
+        return json.dumps({'topic': ch, 'type': 'snapshot', 'data': data,
+                           'cross_seq': self.market.update_id})
+
+    def message(self, ch):
+        symbol = ch.split('.')[-1]
+        if ch.startswith('trade.'):
+            side, price, size = self.market.trade()
+            now = time.time()
+            return json.dumps({'topic': ch, 'data': [{
+                'timestamp': iso8601z(now), 'trade_time_ms': int(now * 1000),
+                'symbol': symbol, 'side': side, 'size': round(size * price),
+                'price': price, 'trade_id': str(next(self.seq))}]})
+        _, level = self.market.update()
+        return json.dumps({'topic': ch, 'type': 'delta', 'data': {
+            'delete': [], 'update': [self.__level(ch, level)],
+            'insert': []}, 'cross_seq': self.market.update_id})
+
+    def __level(self, ch, level):
+        side, price, size = level
+        return {'price': str(price), 'symbol': ch.split('.')[-1],
+                'id': int(price * 10000),  # increases as price rises
+                'side': side, 'size': round(size * price)}
+
+
+class BinanceProtocol(MockProtocol):
+    def __init__(self, market, path):
+        super().__init__(market, path)
+        self.last_id = {}  # {ch: last update id}
+
+    def on_message(self, frame):
+        msg = json.loads(frame)
+        reply = [json.dumps({'result': None, 'id': msg['id']})]
+        if msg['method'] == 'SUBSCRIBE':
+            return msg['params'], [], reply
+        elif msg['method'] == 'UNSUBSCRIBE':
+            return [], msg['params'], reply
+        return [], [], reply
+
+    def message(self, ch):
+        symbol, _, event = ch.partition('@')
+        ts = int(time.time() * 1000)
+        id_ = next(self.seq)
+        if event == 'trade':
+            side, price, size = self.market.trade()
+            data = {'e': 'trade', 'E': ts, 's': symbol.upper(), 't': id_,
+                    'p': str(price), 'q': str(size), 'm': side != 'Buy'}
+        else:
+            _, (side, price, size) = self.market.update()
+            level = [[str(price), str(size)]]
+            u = self.market.update_id
+            pu = self.last_id.get(ch, u - 1)
+            self.last_id[ch] = u
+            data = {'e': 'depthUpdate', 'E': ts, 's': symbol.upper(),
+                    'U': pu + 1, 'u': u, 'pu': pu,
+                    'b': level if side == 'Buy' else [],
+                    'a': [] if side == 'Buy' else level}
+        if self.path.startswith('/stream'):  # combined stream
+            data = {'stream': ch, 'data': data}
+        return json.dumps(data)
+
+
+class BitbankProtocol(MockProtocol):
+    def on_open(self):
+        return ['0{"sid":"mock","upgrades":[],'
+                '"pingInterval":25000,"pingTimeout":60000}', '40']
+
+    def on_message(self, frame):
+        if frame == '2':
+            return [], [], ['3']  # engine.io pong
+        if frame.startswith('42'):
+            event, ch = json.loads(frame[2:])
+            if event == 'join-room':
+                return [ch], [], []
+            elif event == 'leave-room':
+                return [], [ch], []
+        return [], [], []
+
+    def message(self, ch):
+        now = int(time.time() * 1000)
+        if ch.startswith('transactions_'):
+            side, price, size = self.market.trade()
+            data = {'transactions': [{
+                'transaction_id': next(self.seq), 'side': side.lower(),
+                'price': str(price), 'amount': str(size),
+                'executed_at': now}]}
+        elif ch.startswith('depth_whole_'):
+            bids, asks = self.market.book()
+            data = {'bids': [[str(p), str(s)] for p, s in bids],
+                    'asks': [[str(p), str(s)] for p, s in asks],
+                    'timestamp': now,
+                    'sequenceId': str(self.market.update_id)}
+        else:
+            _, (side, price, size) = self.market.update()
+            level = [[str(price), str(size)]]
+            data = {'b': level if side == 'Buy' else [],
+                    'a': [] if side == 'Buy' else level,
+                    't': now, 's': str(self.market.update_id)}
+        return '42' + json.dumps(
+            ['message', {'room_name': ch, 'message': {'data': data}}])
+
+
+class MockExchangeServer:
+    '''
+    Local websocket server speaking subscription protocols of exchanges.
+    Subscribed channels are fed with synthetic messages at rate
+    (messages/second/channel), or with recorded frames if given.
+    '''
+    PROTOCOLS = {
+        BITFLYER: BitflyerProtocol,
+        BITMEX: BitmexProtocol,
+        BYBIT: BybitProtocol,
+        BINANCE: BinanceProtocol,
+        BITBANK: BitbankProtocol,
+    }
+
+    def __init__(self, protocol, rate=100, frames=None,
+                 host='localhost', port=0):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.protocol = self.PROTOCOLS[protocol]
+        self.rate = rate
+        self.frames = frames  # e.g. payloads of FrameReplayer.frames()
+        self.host = host
+        self.port = port  # 0: any free port
+        self.market = MockMarket()
+        self.connections = 0
+        self.sent = 0  # number of sent frames
+        self.received = []  # frames received from clients
+        self.stalled = set()  # channels not fed until unsubscribed
+        self.__server = None
+        self.__loop = new_event_loop('MockExchangeServer')
+
+    @property
+    def url(self):
+        return f'ws://{self.host}:{self.port}'
+
+    def start(self, timeout=10):
+        asyncio.run_coroutine_threadsafe(
+            self.__start(), self.__loop).result(timeout)
+        self.log.info(f'listening on {self.url}')
+        return self
+
+    def stop(self, timeout=10):
+        asyncio.run_coroutine_threadsafe(
+            self.__stop(), self.__loop).result(timeout)
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+
+    def stall(self, ch):
+        # stop feeding ch like a silently dead subscription
+        self.stalled.add(ch)
+
+    def create_websocket(self, cls, *args, path=''):
+        # websocket of cls connected to this server instead of exchange
+        ws_cls = type(cls.__name__, (cls,), {'ENDPOINT': self.url + path})
+        return ws_cls(*args)
+
+    async def __start(self):
+        self.__server = await websockets.serve(
+            self.__handler, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+
+    async def __stop(self):
+        self.__server.close()
+        await self.__server.wait_closed()
+
+    async def __handler(self, ws, path):
+        proto = self.protocol(self.market, path)
+        chs = {}  # subscribed channels (ordered set)
+        self.connections += 1
+        feeder = asyncio.ensure_future(self.__feed(ws, proto, chs))
+        try:
+            for frame in proto.on_open():
+                await ws.send(frame)
+            async for frame in ws:
+                self.received.append(frame)
+                sub, unsub, replies = proto.on_message(frame)
+                for r in replies:
+                    await ws.send(r)
+                for ch in sub:
+                    snapshot = proto.snapshot(ch)
+                    if snapshot:
+                        await ws.send(snapshot)
+                    chs[ch] = None
+                for ch in unsub:
+                    chs.pop(ch, None)
+                    self.stalled.discard(ch)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            feeder.cancel()
+            self.stalled -= set(chs)
+            self.connections -= 1
+
+    async def __feed(self, ws, proto, chs):
+        interval = max(0.001, min(0.1, 1 / self.rate))
+        frames = self.frames and itertools.cycle(self.frames)
+        start, count = time.time(), 0
+        while True:
+            await asyncio.sleep(interval)
+            n = int((time.time() - start) * self.rate) - count
+            count += n
+            if not chs:
+                continue
+            for _ in range(min(n, self.rate)):  # at most 1 second of delay
+                if frames:
+                    await ws.send(next(frames))
+                    self.sent += 1
+                    continue
+                for ch in list(chs):
+                    if ch in self.stalled:
+                        continue
+                    await ws.send(proto.message(ch))
+                    self.sent += 1
@@ -0,0 +1,61 @@
+import numpy as np
+
+from ..base.orderbook import BID, ASK
+
+
+class OrderbookArray:
+    '''
+    Top depth levels of an orderbook in float64 arrays of [price, size].
+    Arrays are preallocated and refreshed in place on every update.
+    '''
+
+    def __init__(self, ob, depth=20):
+        self.ob = ob
+        self.depth = depth
+        self.levels = (np.zeros((depth, 2)), np.zeros((depth, 2)))
+        self.n = [0, 0]  # number of valid levels of each side
+
+    def refresh(self):
+        self.n[BID] = self.__copy(self.levels[BID], self.ob.bids())
+        self.n[ASK] = self.__copy(self.levels[ASK], self.ob.asks())
+
+    def bids(self):
+        return self.levels[BID][:self.n[BID]]  # view, best price first
+
+    def asks(self):
+        return self.levels[ASK][:self.n[ASK]]
+
+    def side(self, side):
+        return self.levels[side][:self.n[side]]
+
+    def cumulative_depth(self, side):
+        return np.cumsum(self.side(side)[:, 1])
+
+    def impact_price(self, side, size):
+        # price of the deepest level to fill size. None: not enough depth
+        a = self.side(side)
+        i = np.searchsorted(np.cumsum(a[:, 1]), size)
+        return a[i, 0] if i < len(a) else None
+
+    def vwap(self, side, size):
+        # average price to fill size. None: not enough depth
+        a = self.side(side)
+        cum = np.cumsum(a[:, 1])
+        i = np.searchsorted(cum, size)
+        if i >= len(a):
+            return None
+        filled = a[:i, 1]
+        rest = size - (cum[i - 1] if i else 0)
+        return (a[:i, 0] @ filled + a[i, 0] * rest) / size
+
+    def imbalance(self, levels=None):
+        # (bid size - ask size) / (bid size + ask size) of top levels
+        b = self.bids()[:levels, 1].sum()
+        a = self.asks()[:levels, 1].sum()
+        return (b - a) / (b + a) if b + a else 0.0
+
+    def __copy(self, arr, levels):
+        n = min(len(levels), self.depth)
+        if n:
+            arr[:n] = levels[:n]
+        return n
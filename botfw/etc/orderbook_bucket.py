@@ -0,0 +1,76 @@
+import math
+
+from sortedcontainers import SortedDict
+
+from ..base.orderbook import BID, ASK, RESET
+
+EPS = 1e-9  # tolerance of float division at bucket boundaries
+
+
+class BucketOrderbook:
+    '''
+    Orderbook aggregated to price buckets, updated incrementally from
+    level changes of the raw book (O(changed levels)).
+    Bids are floored and asks are ceiled to a multiple of bucket, so
+    the price of a bucket is the worst price of levels in it.
+    '''
+
+    def __init__(self, ob, bucket):
+        self.ob = ob
+        self.bucket = bucket
+        self.__levels = ({}, {})  # {price: size} of raw bids and asks
+        self.__count = ({}, {})  # {bucket index: number of raw levels}
+        self.__reset()
+        for p, s in ob.bids():
+            self.__on_level(BID, p, s)
+        for p, s in ob.asks():
+            self.__on_level(ASK, p, s)
+        ob.add_level_callback(self.__on_level)
+
+    def close(self):
+        self.ob.remove_level_callback(self.__on_level)
+        if self.ob.buckets.get(self.bucket) is self:
+            del self.ob.buckets[self.bucket]
+
+    def bids(self):
+        return self.sd_bids.values()
+
+    def asks(self):
+        return self.sd_asks.values()
+
+    def __reset(self):
+        self.sd_bids = SortedDict()  # {-index: [price, size]}
+        self.sd_asks = SortedDict()  # {index: [price, size]}
+        for d in self.__levels + self.__count:
+            d.clear()
+
+    def __on_level(self, side, price, size):
+        if side == RESET:
+            self.__reset()
+            return
+
+        levels, count = self.__levels[side], self.__count[side]
+        old = levels.pop(price, 0)
+        if size:
+            levels[price] = size
+        if size == old:
+            return
+
+        if side == BID:
+            i = math.floor(price / self.bucket + EPS)
+            sd, key = self.sd_bids, -i
+        else:
+            i = math.ceil(price / self.bucket - EPS)
+            sd, key = self.sd_asks, i
+
+        n = count.get(i, 0) + (size != 0) - (old != 0)
+        if n:
+            count[i] = n
+            lv = sd.get(key)
+            if lv:
+                lv[1] += size - old
+            else:
+                sd[key] = [i * self.bucket, size]
+        else:
+            count.pop(i, None)
+            sd.pop(key, None)  # avoid residue of float sums
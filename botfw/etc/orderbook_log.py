@@ -0,0 +1,146 @@
+import time
+import glob
+import struct
+import bisect
+import collections
+
+from ..base.orderbook import BID, ASK, RESET
+
+KEYFRAME = 3  # RESET followed by all levels of the book
+RECORD = struct.Struct('<dBdd')  # ts, side, price, size
+
+
+def apply_record(book, side, price, size):
+    # book: ({price: size} of bids, {price: size} of asks)
+    if side >= RESET:
+        book[BID].clear()
+        book[ASK].clear()
+    elif size:
+        book[side][price] = size
+    else:
+        book[side].pop(price, None)
+
+
+def sorted_book(book):
+    # -> (bids, asks) in the same form as bids() and asks() of orderbook
+    return ([[p, s] for p, s in sorted(book[BID].items(), reverse=True)],
+            [[p, s] for p, s in sorted(book[ASK].items())])
+
+
+def read_records(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    n = len(data) // RECORD.size
+    return RECORD.iter_unpack(data[:n * RECORD.size])
+
+
+def load_book(path, ts):
+    '''
+    Reconstruct a book at ts from files written by OrderbookDeltaLog.
+    Each file starts with a keyframe.
+    '''
+    files = sorted(glob.glob(f'{path}.*'))
+    starts = []
+    for f in files:
+        with open(f, 'rb') as fp:
+            head = fp.read(RECORD.size)
+        starts.append(RECORD.unpack(head)[0] if head else float('inf'))
+    i = bisect.bisect_right(starts, ts) - 1
+    if i < 0:
+        return None
+
+    book = ({}, {})
+    for ts_, side, price, size in read_records(files[i]):
+        if ts_ > ts:
+            break
+        apply_record(book, side, price, size)
+    return sorted_book(book)
+
+
+class OrderbookDeltaLog:
+    '''
+    Log level changes of an orderbook as packed (ts, side, price, size)
+    records into an in-memory ring and optional rolling files.
+    Keyframes are inserted every keyframe_interval seconds so that
+    the book at any logged timestamp can be reconstructed.
+    '''
+
+    def __init__(self, ob, capacity=1000000, keyframe_interval=60,
+                 path=None, file_size=100 * 1024 * 1024):
+        self.ob = ob
+        self.capacity = capacity  # number of records in memory
+        self.keyframe_interval = keyframe_interval
+        self.path = path  # files: {path}.{start time}
+        self.file_size = file_size
+
+        self.buf = bytearray(capacity * RECORD.size)
+        self.seq = 0  # number of records written so far
+        self.keyframes = collections.deque()  # [(ts, seq)]
+        self.__file = None
+        self.__file_bytes = 0
+
+        ob.add_level_callback(self.__on_level)
+        ob.add_callback(self.__on_update)
+        self.keyframe()
+
+    def close(self):
+        self.ob.remove_level_callback(self.__on_level)
+        self.ob.remove_callback(self.__on_update)
+        if self.__file:
+            self.__file.close()
+            self.__file = None
+
+    def keyframe(self):
+        ts = time.time()
+        if self.path and (
+                not self.__file or self.__file_bytes >= self.file_size):
+            self.__open_file(ts)
+        self.keyframes.append((ts, self.seq))
+        self.__write(ts, KEYFRAME, 0.0, 0.0)
+        for p, s in self.ob.bids():
+            self.__write(ts, BID, p, s)
+        for p, s in self.ob.asks():
+            self.__write(ts, ASK, p, s)
+        if self.__file:
+            self.__file.flush()
+
+        oldest = self.seq - self.capacity
+        while self.keyframes and self.keyframes[0][1] < oldest:
+            self.keyframes.popleft()
+
+    def book_at(self, ts):
+        # (bids, asks) at ts. None: ts is older than records in memory
+        i = bisect.bisect_right(self.keyframes, (ts, float('inf'))) - 1
+        if i < 0 or self.keyframes[i][1] < self.seq - self.capacity:
+            return None  # overwritten
+
+        book = ({}, {})
+        size = RECORD.size
+        for seq in range(self.keyframes[i][1], self.seq):
+            rec = RECORD.unpack_from(self.buf, seq % self.capacity * size)
+            if rec[0] > ts:
+                break
+            apply_record(book, *rec[1:])
+        return sorted_book(book)
+
+    def __on_level(self, side, price, size):
+        self.__write(time.time(), side, price, size)
+
+    def __on_update(self):
+        if time.time() - self.keyframes[-1][0] >= self.keyframe_interval:
+            self.keyframe()
+
+    def __write(self, ts, side, price, size):
+        RECORD.pack_into(
+            self.buf, self.seq % self.capacity * RECORD.size,
+            ts, side, price, size)
+        self.seq += 1
+        if self.__file:
+            self.__file.write(RECORD.pack(ts, side, price, size))
+            self.__file_bytes += RECORD.size
+
+    def __open_file(self, ts):
+        if self.__file:
+            self.__file.close()
+        self.__file = open(f'{self.path}.{ts:.6f}', 'wb')
+        self.__file_bytes = 0
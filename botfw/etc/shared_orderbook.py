@@ -0,0 +1,173 @@
+import time
+import logging
+import struct
+import threading
+import traceback
+from multiprocessing import shared_memory, resource_tracker
+
+from ..base.orderbook import OrderbookBase
+
+# segment: header + bids + asks, levels are (price, size) as double
+SEQ = struct.Struct('<Q')  # odd while the writer is updating the segment
+HEADER = struct.Struct('<QdIII')  # seq, ts, depth, number of bids, asks
+
+published = set()  # names of segments created in this process
+
+
+def segment_name(exchange, symbol):
+    # e.g. ('Bitflyer', 'FX_BTC_JPY') -> 'botfw_Bitflyer_FX_BTC_JPY'
+    return f'botfw_{exchange}_{symbol}'.replace('/', '')
+
+
+def create_segment(name, size, log):
+    # -> (segment, True if a segment left by a crashed publisher is reused)
+    try:
+        return shared_memory.SharedMemory(name, create=True, size=size), False
+    except FileExistsError:
+        shm = shared_memory.SharedMemory(name)
+        if shm.size == size:
+            return shm, True
+    log.warning(f'recreate segment {name} of another size')
+    shm.close()
+    shm.unlink()
+    return shared_memory.SharedMemory(name, create=True, size=size), False
+
+
+def attach_segment(name, log, timeout=60):
+    # wait for the publisher and attach to its segment
+    ts = time.time()
+    count = 0
+    while True:
+        try:
+            shm = shared_memory.SharedMemory(name)
+            break
+        except FileNotFoundError:
+            if time.time() - ts > timeout:
+                raise Exception(f'publisher of {name} is not found')
+            count += 1
+            if count % 50 == 0:
+                log.info(f'waiting for publisher of {name}')
+            time.sleep(0.1)
+    # the segment is owned by the publisher.
+    # do not let resource_tracker unlink it at exit of this process
+    if name not in published:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def segment_size(depth):
+    return HEADER.size + depth * 2 * 16
+
+
+class SharedOrderbookPublisher:
+    '''
+    Write top levels of an orderbook to a shared memory segment on each
+    update, under a sequence lock (readers retry if seq changed while
+    they copied the segment). Read by SharedOrderbook in other processes.
+    '''
+
+    def __init__(self, ob, name, depth=20):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.ob = ob
+        self.name = name
+        self.depth = depth
+        self.seq = 0
+        self.shm, reused = create_segment(name, segment_size(depth), self.log)
+        if reused:  # readers continue from seq of the crashed publisher
+            self.seq = (SEQ.unpack_from(self.shm.buf)[0] + 1) & ~1
+        published.add(name)
+        self.__publish()
+        ob.add_callback(self.__publish)
+
+    def close(self):
+        self.ob.remove_callback(self.__publish)
+        self.shm.close()
+        self.shm.unlink()
+        published.discard(self.name)
+
+    def __publish(self):
+        buf, depth = self.shm.buf, self.depth
+        bids, asks = self.ob.bids()[:depth], self.ob.asks()[:depth]
+        SEQ.pack_into(buf, 0, self.seq + 1)
+        offset = HEADER.size
+        for levels in (bids, asks):
+            v = [x for lv in levels for x in lv]
+            struct.pack_into(f'<{len(v)}d', buf, offset, *v)
+            offset += depth * 16
+        HEADER.pack_into(
+            buf, 0, self.seq + 1, time.time(), depth, len(bids), len(asks))
+        self.seq += 2
+        SEQ.pack_into(buf, 0, self.seq)
+
+
+class SharedOrderbook(OrderbookBase):
+    '''
+    Orderbook read from a segment written by SharedOrderbookPublisher.
+    A thread polls the segment every interval seconds and triggers
+    callbacks when it is updated.
+    '''
+
+    def __init__(self, name, interval=0.001, timeout=60):
+        super().__init__()
+        self.name = name
+        self.interval = interval
+        self.ts = 0  # publish time of the current book
+        self.running = True
+        self.shm = attach_segment(name, self.log, timeout)
+        self.__seq = 0
+        self.__thread = threading.Thread(
+            name=self.log.name, target=self.__worker, daemon=True)
+        self.__thread.start()
+
+    def init(self):
+        self.ls_bids, self.ls_asks = [], []
+
+    def bids(self):
+        return self.ls_bids
+
+    def asks(self):
+        return self.ls_asks
+
+    def close(self):
+        self.running = False
+        self.__thread.join()
+        self.shm.close()
+
+    def __read(self):
+        # -> (seq, data) of a consistent copy, or (seq, None) if unchanged
+        buf = self.shm.buf
+        while True:
+            seq = SEQ.unpack_from(buf)[0]
+            if seq == self.__seq:
+                return seq, None
+            if seq & 1:
+                continue  # writer is updating
+            data = bytes(buf)
+            if SEQ.unpack_from(buf)[0] == seq:
+                return seq, data
+
+    def __update(self, data):
+        _, ts, depth, nb, na = HEADER.unpack_from(data)
+        books = []
+        offset = HEADER.size
+        for n in (nb, na):
+            it = iter(struct.unpack_from(f'<{n * 2}d', data, offset))
+            books.append(list(zip(it, it)))
+            offset += depth * 16
+        self.ls_bids, self.ls_asks = books
+        self.ts = ts
+
+        if self.level_cb:
+            self._notify_book()
+        self._trigger_callback()
+
+    def __worker(self):
+        while self.running:
+            try:
+                seq, data = self.__read()
+                if data:
+                    self.__seq = seq
+                    self.__update(data)
+            except Exception:
+                self.log.error(traceback.format_exc())
+            time.sleep(self.interval)
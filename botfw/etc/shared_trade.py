@@ -0,0 +1,127 @@
+import time
+import logging
+import struct
+import threading
+import traceback
+
+from ..base.trade import TradeBase
+from .shared_orderbook import published, create_segment, attach_segment
+
+# segment: header + ring of records
+HEADER = struct.Struct('<QI')  # number of records written, capacity
+RECORD = struct.Struct('<ddd')  # ts, price, size
+
+
+def segment_size(capacity):
+    return HEADER.size + capacity * RECORD.size
+
+
+class SharedTradePublisher:
+    '''
+    Write trades to a ring of records in a shared memory segment.
+    The record is written before the count is incremented, so readers
+    can consume records below the count with their own cursors.
+    '''
+
+    def __init__(self, trade, name, capacity=65536):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.trade = trade
+        self.name = name
+        self.capacity = capacity
+        self.count = 0
+        self.shm, reused = create_segment(
+            name, segment_size(capacity), self.log)
+        if reused:  # readers continue from count of the crashed publisher
+            self.count = HEADER.unpack_from(self.shm.buf)[0]
+        HEADER.pack_into(self.shm.buf, 0, self.count, capacity)
+        published.add(name)
+        trade.add_callback(self.__on_trade)
+
+    def close(self):
+        self.trade.remove_callback(self.__on_trade)
+        self.shm.close()
+        self.shm.unlink()
+        published.discard(self.name)
+
+    def __on_trade(self, ts, price, size):
+        buf = self.shm.buf
+        RECORD.pack_into(
+            buf, HEADER.size + self.count % self.capacity * RECORD.size,
+            ts, price, size)
+        self.count += 1
+        HEADER.pack_into(buf, 0, self.count, self.capacity)
+
+
+class SharedTrade(TradeBase):
+    '''
+    Trades read from a segment written by SharedTradePublisher.
+    A thread polls the segment every interval seconds and triggers
+    callbacks for new records. Records overwritten before they are read
+    are counted in overrun.
+    '''
+
+    def __init__(self, name, interval=0.001, from_oldest=False, timeout=60):
+        super().__init__()
+        self.name = name
+        self.interval = interval
+        self.running = True
+        self.overrun = 0  # number of lost records
+        self.shm = attach_segment(name, self.log, timeout)
+        count, self.capacity = HEADER.unpack_from(self.shm.buf)
+        # cursor: number of records consumed
+        self.cursor = max(count - self.capacity + 1, 0) \
+            if from_oldest else count
+        self.__thread = threading.Thread(
+            name=self.log.name, target=self.__worker, daemon=True)
+        self.__thread.start()
+
+    def close(self):
+        self.running = False
+        self.__thread.join()
+        self.shm.close()
+
+    def __read(self):
+        # -> [(ts, price, size)] of new records
+        buf, cap = self.shm.buf, self.capacity
+        count = HEADER.unpack_from(buf)[0]
+        self.__check_overrun(count)
+        if count <= self.cursor:
+            return []
+
+        start, end = self.cursor % cap, count % cap
+        offset = HEADER.size
+        if start < end:
+            data = bytes(buf[offset + start * RECORD.size:
+                             offset + end * RECORD.size])
+        else:  # wrapped
+            data = bytes(buf[offset + start * RECORD.size:
+                             offset + cap * RECORD.size]) + \
+                bytes(buf[offset:offset + end * RECORD.size])
+        records = list(RECORD.iter_unpack(data))
+
+        # records overwritten while they were copied
+        first = self.cursor
+        self.__check_overrun(HEADER.unpack_from(buf)[0])
+        records = records[self.cursor - first:]
+        self.cursor = max(self.cursor, count)
+        return records
+
+    def __check_overrun(self, count):
+        # record count may be being written into the slot of count - cap,
+        # so count - cap + 1 is the oldest record which is safe to read
+        oldest = count - self.capacity + 1
+        if oldest > self.cursor:
+            n = oldest - self.cursor
+            self.overrun += n
+            self.cursor = oldest
+            self.log.warning(f'{n} trades are lost (overrun)')
+
+    def __worker(self):
+        while self.running:
+            try:
+                for ts, price, size in self.__read():
+                    self.ltp = price
+                    self._trigger_callback(ts, price, size)
+            except Exception:
+                self.log.error(traceback.format_exc())
+            time.sleep(self.interval)
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import collections
+
+
+class CallbackStream:
+    '''
+    Queue which receives callbacks from any thread and is consumed by
+    a coroutine. Create it in the coroutine which consumes it.
+    '''
+
+    def __init__(self, maxlen=None):
+        self.loop = asyncio.get_event_loop()
+        self.thread_id = threading.get_ident()
+        self.queue = collections.deque()  # [args]
+        self.maxlen = maxlen  # drop oldest items if exceeded
+        self.dropped = 0
+        self.__waiter = None
+
+    def put(self, *args):
+        if threading.get_ident() == self.thread_id:
+            self.__put(args)  # no thread hop on the same loop
+        else:
+            self.loop.call_soon_threadsafe(self.__put, args)
+
+    async def get(self):
+        while not self.queue:
+            self.__waiter = self.loop.create_future()
+            await self.__waiter
+        return self.queue.popleft()
+
+    def __put(self, args):
+        if self.maxlen and len(self.queue) >= self.maxlen:
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append(args)
+        w = self.__waiter
+        if w and not w.done():
+            w.set_result(None)
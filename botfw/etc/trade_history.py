@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+
+TS = 0
+PRICE = 1
+SIZE = 2  # negative: sell
+
+
+class TradeHistory:
+    '''
+    Recent trades in a float64 ring of [ts, price, size].
+    Each record is written twice (at i and i + capacity), so the latest
+    records are always a contiguous view and window queries need no copy.
+    A view of n trades stays intact for capacity - n more trades, so use
+    it before further trades arrive. The whole ring is returned as a copy.
+    '''
+
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.buf = np.zeros((capacity * 2, 3))
+        self.count = 0  # number of trades appended so far
+
+    def append(self, ts, price, size):
+        i = self.count % self.capacity
+        self.buf[i] = self.buf[i + self.capacity] = (ts, price, size)
+        self.count += 1
+
+    def last(self, n=None):
+        # view of the latest n trades, oldest first. n None: all trades
+        a = self.__view(n)
+        return a.copy() if len(a) == self.capacity else a
+
+    def window(self, seconds, now=None):
+        # view of trades in the last seconds
+        a = self.__view()
+        since = (now or time.time()) - seconds
+        return self.last(len(a) - np.searchsorted(a[:, TS], since))
+
+    def count_in(self, seconds, now=None):
+        return len(self.window(seconds, now))
+
+    def volume(self, seconds, now=None):
+        return np.abs(self.window(seconds, now)[:, SIZE]).sum()
+
+    def signed_volume(self, seconds, now=None):
+        # buy volume - sell volume
+        return self.window(seconds, now)[:, SIZE].sum()
+
+    def vwap(self, seconds, now=None):
+        # None: no trade in the window
+        a = self.window(seconds, now)
+        size = np.abs(a[:, SIZE])
+        total = size.sum()
+        return a[:, PRICE] @ size / total if total else None
+
+    def high(self, seconds, now=None):
+        a = self.window(seconds, now)
+        return a[:, PRICE].max() if len(a) else None
+
+    def low(self, seconds, now=None):
+        a = self.window(seconds, now)
+        return a[:, PRICE].min() if len(a) else None
+
+    def __view(self, n=None):
+        stored = min(self.count, self.capacity)
+        n = stored if n is None else min(n, stored)
+        end = self.count % self.capacity + self.capacity
+        return self.buf[end - n:end]
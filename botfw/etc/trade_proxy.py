@@ -12,6 +12,7 @@ class TradeProxy:
         self.log = logging.getLogger(self.__class__.__name__)
         self.clients = {}  # {client: ((exchange, symbol), callback)}
         self.trades = {}  # {(exchange, symbol)}
+        self.websockets = {}  # {exchange: websocket}, shared by trades
         self.server = websockets.serve(self.handle_ws, "localhost", port)
         self.loop = asyncio.get_event_loop()
 
@@ -47,7 +48,7 @@ class TradeProxy:
             t = self.trades[key]
             t.remove_callback(cb)
             if not t.cb:
-                t.ws.stop()
+                t.close()  # unsubscribe only. websocket is kept
                 del self.trades[key]
 
         del self.clients[addr]
@@ -68,7 +69,10 @@ class TradeProxy:
         t = self.trades.get(key)
         if not t:
             ex = getattr(fw, exchange)
-            t = ex.Trade(symbol)
+            ws = self.websockets.get(exchange)
+            if not ws:
+                ws = self.websockets[exchange] = ex.Websocket()
+            t = ex.Trade(symbol, ws)
             self.trades[key] = t
 
         def cb(ts, price, size):
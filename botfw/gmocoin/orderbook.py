@@ -10,7 +10,7 @@ class GmocoinOrderbook(OrderbookBase):
         self.ws = ws or GmocoinWebsocket()
 
         market_id = GmocoinApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(('orderbooks', market_id), self.__on_message)
+        self._subscribe(('orderbooks', market_id), self.__on_message)
 
     def init(self):
         self.ls_bids, self.ls_asks = [], []
@@ -29,4 +29,6 @@ class GmocoinOrderbook(OrderbookBase):
             asks.append((float(a['price']), float(a['size'])))
         self.ls_bids, self.ls_asks = bids, asks
 
+        if self.level_cb:
+            self._notify_book()  # each message replaces the book
         self._trigger_callback()
@@ -10,7 +10,7 @@ class GmocoinTrade(TradeBase):
         self.symbol = symbol
         self.ws = ws or GmocoinWebsocket()
         market_id = GmocoinApi.ccxt_instance().market_id(self.symbol)
-        self.ws.subscribe(('trades', market_id), self.__on_message)
+        self._subscribe(('trades', market_id), self.__on_message)
 
     def __on_message(self, msg):
         ts = unix_time_from_ISO8601Z(msg['timestamp'])
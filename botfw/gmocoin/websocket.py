@@ -15,29 +15,35 @@ class GmocoinWebsocket(WebsocketBase):
 
     def _subscribe(self, ch):
         # ch = (channel, symbol)
-        args = {'channel': ch[0]}
-        if ch[1]:
-            args['symbol'] = ch[1]
-        self.command('subscribe', args)
+        self.command('subscribe', self.__channel_args(ch))
+
+    def _unsubscribe(self, ch):
+        self.command('unsubscribe', self.__channel_args(ch))
 
     def _authenticate(self):
         pass
 
+    def __channel_args(self, ch):
+        args = {'channel': ch[0]}
+        if ch[1]:
+            args['symbol'] = ch[1]
+        return args
+
     def _handle_message(self, msg):
         if 'error' in msg:
             self.log.error(msg['error'])
         else:
             ch0 = msg['channel']
             ch1 = None if ch0 in self.NO_SYMBOL_CHANNEL else msg['symbol']
-            self._ch_cb[(ch0, ch1)](msg)
+            self._dispatch((ch0, ch1), msg)
 
 
 class GmocoinWebsocketPrivate(GmocoinWebsocket):
     ENDPOINT = 'wss://api.coin.z.com/ws/private/v1'
 
-    def __init__(self, api):
+    def __init__(self, api, loop=None):
         self.__api = api  # _on_init() may be called in super().__init__()
-        super().__init__()
+        super().__init__(loop=loop)
 
     def _on_init(self):
         res = self.__api.websocket_key()
@@ -47,3 +53,6 @@ class GmocoinWebsocketPrivate(GmocoinWebsocket):
     def _on_open(self):
         super()._on_open()
         self._set_auth_result(True)
+
+    def _create_replica(self):
+        return self.__class__(self.__api, loop=self._loop)
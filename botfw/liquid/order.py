@@ -1,8 +1,8 @@
-import json
 import logging
 
 from ..base import order as od
 from .api import LiquidApi
+from ..etc import json_decoder
 
 
 class LiquidOrderManager(od.OrderManagerBase):
@@ -31,7 +31,7 @@ class LiquidOrderManager(od.OrderManagerBase):
         return o
 
     def __on_events(self, msg):
-        e = json.loads(msg['data'])
+        e = json_decoder.loads(msg['data'])
         oe = od.OrderEvent()
         oe.info = e
         ch = msg['channel']
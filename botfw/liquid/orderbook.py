@@ -1,7 +1,6 @@
-import json
-
 from ..base.orderbook import OrderbookBase
 from .websocket import LiquidWebsocket
+from ..etc import json_decoder
 
 
 class LiquidOrderbook(OrderbookBase):
@@ -13,8 +12,8 @@ class LiquidOrderbook(OrderbookBase):
         market_id = self.symbol.replace('/', '').lower()
         self.ch_buy = f'price_ladders_cash_{market_id}_buy'
         self.ch_sell = f'price_ladders_cash_{market_id}_sell'
-        self.ws.subscribe(self.ch_buy, self.__on_message)
-        self.ws.subscribe(self.ch_sell, self.__on_message)
+        self._subscribe(self.ch_buy, self.__on_message)
+        self._subscribe(self.ch_sell, self.__on_message)
 
     def init(self):
         self.ls_bids, self.ls_asks = [], []
@@ -27,7 +26,7 @@ class LiquidOrderbook(OrderbookBase):
 
     def __on_message(self, msg):
         ob = []
-        for d in json.loads(msg['data']):
+        for d in json_decoder.loads(msg['data']):
             ob.append((float(d[0]), float(d[1])))
 
         ch = msg['channel']
@@ -38,4 +37,6 @@ class LiquidOrderbook(OrderbookBase):
         else:
             self.log.error(f'Unknown channel {ch}')
 
+        if self.level_cb:
+            self._notify_book()  # each message replaces the book
         self._trigger_callback()
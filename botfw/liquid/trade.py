@@ -1,7 +1,6 @@
-import json
-
 from ..base.trade import TradeBase
 from .websocket import LiquidWebsocket
+from ..etc import json_decoder
 
 
 class LiquidTrade(TradeBase):
@@ -11,11 +10,11 @@ class LiquidTrade(TradeBase):
         self.ws = ws or LiquidWebsocket()
 
         market_id = self.symbol.replace('/', '').lower()
-        self.ws.subscribe(
+        self._subscribe(
             f'execution_details_cash_{market_id}', self.__on_message)
 
     def __on_message(self, msg):
-        data = json.loads(msg['data'])
+        data = json_decoder.loads(msg['data'])
         ts = data['created_at']
         price = data['price']
         size = float(data['quantity'])
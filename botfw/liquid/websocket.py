@@ -5,17 +5,20 @@ from .jwt import create_jwt
 class LiquidWebsocket(WebsocketBase):
     ENDPOINT = 'wss://tap.liquid.com/app/LiquidTapClient'
 
-    def command(self, op, args=None, cb=None):
+    def command(self, op, args=None, cb=None, priority=False):
         msg = {'event': op}
         if args:
             msg['data'] = args
 
-        self.send(msg)
+        self.send(msg, priority)
         self.log.info(f'{msg}')
 
     def _subscribe(self, ch):
         self.command('pusher:subscribe', {'channel': ch})
 
+    def _unsubscribe(self, ch):
+        self.command('pusher:unsubscribe', {'channel': ch})
+
     def _authenticate(self):
         auth_payload = {
             'path': '/realtime',
@@ -23,12 +26,12 @@ class LiquidWebsocket(WebsocketBase):
                 'X-Quoine-Auth': create_jwt(self.key, self.secret),
             },
         }
-        self.command('quoine:auth_request', auth_payload)
+        self.command('quoine:auth_request', auth_payload, priority=True)
 
     def _handle_message(self, msg):
         e = msg['event']
         if e in ['created', 'updated', 'pnl_updated']:
-            self._ch_cb[msg['channel']](msg)
+            self._dispatch(msg['channel'], msg)
         elif e == 'pusher_internal:subscription_succeeded':
             ch = msg['channel']
             self.log.info(f'subscription succeeded: {ch}')
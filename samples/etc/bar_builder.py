@@ -0,0 +1,28 @@
+# 約定履歴から時間足・出来高足などのOHLCVを逐次生成します
+# 起動時にREST APIの約定履歴で過去の足を生成(ウォームアップ)します
+# 時間足は約定がなくても終了時刻の1秒後(CLOSE_DELAY)に確定します
+
+import time
+import logging
+
+import botfw as fw
+from botfw.etc.bar_builder import BarBuilder, TIME_BAR, VOLUME_BAR
+
+fw.setup_logger(logging.INFO)
+
+trade = fw.Bitflyer.Trade('FX_BTC_JPY')
+builder = BarBuilder(trade, [(TIME_BAR, 60), (VOLUME_BAR, 10)])
+api = fw.Bitflyer.Api.ccxt_instance()  # 約定履歴の取得には認証不要
+builder.warmup(api, 'FX_BTC_JPY', limit=500)
+
+
+def on_bar(bars, bar):
+    ts, o, h, l, c, v = bar[:6]
+    print(f'{bars.type}({bars.interval}) {time.ctime(ts)} '
+          f'o:{o} h:{h} l:{l} c:{c} v:{v:.3f}')
+
+
+builder.add_callback(on_bar)
+
+while True:
+    time.sleep(1)
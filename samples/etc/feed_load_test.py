@@ -0,0 +1,67 @@
+# ローカルの模擬取引所サーバに接続し、フィード処理のスループットと遅延を計測します
+# 本番環境への接続なしにwebsocket、Trade、Orderbookの処理性能を確認できます
+
+# 取引所、チャンネルあたりの送信レート(メッセージ/秒)、計測時間(秒)を指定して実行
+# $ python3 samples/etc/feed_load_test.py bitflyer 1000 10
+
+import sys
+import time
+
+import botfw as fw
+from botfw.etc.mock_exchange import MockExchangeServer
+
+EXCHANGES = {
+    # protocol: (exchange, symbol, market id, websocket path)
+    'bitflyer': (fw.Bitflyer, 'FX_BTC_JPY', 'FX_BTC_JPY', ''),
+    'bitmex': (fw.Bitmex, 'BTC/USD', 'XBTUSD', ''),
+    'bybit': (fw.Bybit, 'BTC/USD', 'BTCUSD', ''),
+    'binance': (fw.Binance, 'BTC/USDT', 'BTCUSDT', '/ws'),
+    'bitbank': (fw.Bitbank, 'BTC/JPY', 'btc_jpy',
+                '/socket.io/?EIO=3&transport=websocket'),
+}
+
+protocol = sys.argv[1]
+rate = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+duration = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+ex, symbol, market_id, path = EXCHANGES[protocol]
+
+# ネットワークなしで銘柄情報を設定
+api = ex.Api._ccxt_class()
+base, _, quote = symbol.partition('/')
+api.set_markets([
+    {'id': market_id, 'symbol': symbol, 'base': base, 'quote': quote}])
+ex.Api._instance = api
+
+server = MockExchangeServer(protocol, rate).start()
+if protocol == 'binance':  # REST APIの板情報も模擬サーバから取得
+    def depth(params={}):
+        bids, asks = server.market.book()
+        return {'lastUpdateId': server.market.update_id,
+                'bids': [[str(p), str(s)] for p, s in bids],
+                'asks': [[str(p), str(s)] for p, s in asks]}
+    api.publicGetDepth = depth
+ws = server.create_websocket(ex.Websocket, path=path)
+trade = ex.Trade(symbol, ws)
+orderbook = ex.Orderbook(symbol, ws)
+
+count = {'trade': 0, 'orderbook': 0}
+trade.add_callback(lambda *_: count.__setitem__('trade', count['trade'] + 1))
+orderbook.add_callback(
+    lambda: count.__setitem__('orderbook', count['orderbook'] + 1))
+
+ws.wait_open()
+time.sleep(1)  # 購読完了を待つ
+ws.latency.reset()
+start, sent = time.time(), server.sent
+base = dict(count)
+time.sleep(duration)
+elapsed = time.time() - start
+
+print(f'sent: {(server.sent - sent) / elapsed:.0f} msg/s')
+for k in count:
+    print(f'{k}: {(count[k] - base[k]) / elapsed:.0f} msg/s')
+print(fw.latency_report())
+
+ws.stop()
+server.stop()
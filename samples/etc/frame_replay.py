@@ -0,0 +1,46 @@
+# 受信したwebsocketのフレームをファイルに記録し、ネットワークなしで再生します
+# 本番環境で発生した板情報や注文管理の不具合の再現、ハンドラのベンチマークなどに利用できます
+
+# 記録 (Ctrl-Cで終了)
+# $ python3 samples/etc/frame_replay.py record frames.bin
+# 再生 (speedを省略すると最高速度で再生)
+# $ python3 samples/etc/frame_replay.py replay frames.bin [speed]
+
+import sys
+import time
+import logging
+
+import botfw as fw
+from botfw.etc.frame_recorder import FrameRecorder, FrameReplayer
+
+SYMBOL = 'FX_BTC_JPY'
+fw.setup_logger(logging.INFO)
+mode, path = sys.argv[1:3]
+
+if mode == 'record':
+    recorder = FrameRecorder(path)
+    ws = fw.Bitflyer.Websocket()
+    ws.set_recorder(recorder)  # 接続毎にidが割り当てられる
+    trade = fw.Bitflyer.Trade(SYMBOL, ws)
+    orderbook = fw.Bitflyer.Orderbook(SYMBOL, ws)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        recorder.close()
+        print(f'{recorder.count} frames')
+
+elif mode == 'replay':
+    speed = float(sys.argv[3]) if len(sys.argv) > 3 else None
+    replayer = FrameReplayer(path)
+    ws = replayer.create_websocket(fw.Bitflyer.Websocket)  # 接続しないwebsocket
+    replayer.attach(ws)  # 同じクラスで記録された接続のフレームを流す
+    trade = fw.Bitflyer.Trade(SYMBOL, ws)
+    orderbook = fw.Bitflyer.Orderbook(SYMBOL, ws)
+
+    ts = time.time()
+    n = replayer.run(speed=speed)  # replayer.run(start=ts)で途中から再生
+    t = time.time() - ts
+    print(f'{n} frames in {t:.3f}s ({n / t:.0f} frames/s)')
+    print(f'ltp: {trade.ltp}')
+    print(f'best bid: {orderbook.bids()[0]}, best ask: {orderbook.asks()[0]}')
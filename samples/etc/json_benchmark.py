@@ -0,0 +1,63 @@
+# websocketで受信したフレームのJSONデコード速度をバックエンドごとに比較します
+# orjsonがインストールされていない場合はjson(標準ライブラリ)のみ計測します
+
+# 記録したフレームのファイル(1行1フレーム、またはFrameRecorderの出力)を指定して実行
+# $ python3 samples/etc/json_benchmark.py frames.txt
+# 引数を省略した場合は各取引所のサンプルフレームを使用します
+
+import os
+import sys
+import time
+
+from botfw.etc import json_decoder
+from botfw.etc.frame_recorder import FrameReplayer
+
+SAMPLE_FRAMES = [
+    # bitflyer lightning_executions
+    '{"jsonrpc":"2.0","method":"channelMessage","params":{"channel":"lightning_executions_FX_BTC_JPY","message":[{"id":2228719616,"side":"BUY","price":6153421.0,"size":0.01,"exec_date":"2021-03-23T12:28:17.4738562Z","buy_child_order_acceptance_id":"JRF20210323-122817-063461","sell_child_order_acceptance_id":"JRF20210323-122817-147591"}]}}',  # noqa: E501
+    # bitflyer lightning_board
+    '{"jsonrpc":"2.0","method":"channelMessage","params":{"channel":"lightning_board_FX_BTC_JPY","message":{"mid_price":6153400.0,"bids":[{"price":6153390.0,"size":0.0},{"price":6153389.0,"size":0.05}],"asks":[{"price":6153420.0,"size":0.3},{"price":6153433.0,"size":0.0}]}}}',  # noqa: E501
+    # binance depthUpdate
+    '{"e":"depthUpdate","E":1616502497263,"s":"BTCUSDT","U":12129291722,"u":12129291749,"b":[["54301.01000000","0.00000000"],["54300.99000000","0.03683700"],["54299.20000000","0.02000000"]],"a":[["54301.02000000","1.10637700"],["54303.56000000","0.00000000"]]}',  # noqa: E501
+    # bitmex orderBookL2
+    '{"table":"orderBookL2","action":"update","data":[{"symbol":"XBTUSD","id":8794561700,"side":"Sell","size":12000},{"symbol":"XBTUSD","id":8794562600,"side":"Buy","size":340500}]}',  # noqa: E501
+    # bitbank (socket.io frameからprefixを除いたもの)
+    '["message",{"room_name":"transactions_btc_jpy","message":{"data":{"transactions":[{"transaction_id":1234567890,"side":"buy","price":"6150000","amount":"0.0100","executed_at":1616502497263}]}}}]',  # noqa: E501
+]
+
+
+def load_frames(path):
+    if os.path.exists(path + '.idx'):  # recorded by FrameRecorder
+        replayer = FrameReplayer(path)
+        frames = [bytes(f[3]) for f in replayer.frames()]
+        replayer.close()
+        return frames
+    with open(path, 'rb') as f:
+        return [line.rstrip(b'\n') for line in f if line.strip()]
+
+
+def bench(loads, frames, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for f in frames:
+            loads(f)
+    return time.perf_counter() - t0
+
+
+if len(sys.argv) > 1:
+    frames = load_frames(sys.argv[1])
+else:
+    frames = SAMPLE_FRAMES
+repeat = max(1, 200000 // len(frames))
+n = repeat * len(frames)
+size = sum(map(len, frames)) * repeat
+
+print(f'{len(frames)} frames x {repeat} ({n} decodes, {size / 1e6:.1f}MB)')
+for name, loads in json_decoder.BACKENDS.items():
+    for text in [True, False]:
+        fs = [f if isinstance(f, str) == text else
+              (f.decode() if text else f.encode()) for f in frames]
+        t = bench(loads, fs, repeat)
+        type_ = 'str' if text else 'bytes'
+        print(f'{name:<8}{type_:<7}{t:8.3f}s {n / t:12.0f} frames/s '
+              f'{size / t / 1e6:8.1f} MB/s')
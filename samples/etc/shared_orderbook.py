@@ -0,0 +1,49 @@
+# 板情報と約定履歴を共有メモリに書き込み、複数の戦略プロセスから読み出します
+# 戦略プロセスはwebsocket接続やJSONのパースなしに同じデータを参照できます
+
+# 配信プロセス(websocketで受信し共有メモリに書き込む)
+# $ python3 samples/etc/shared_orderbook.py publish
+# 戦略プロセス(複数起動可)
+# $ python3 samples/etc/shared_orderbook.py read
+# $ python3 samples/etc/shared_orderbook.py read_trade
+
+import sys
+import time
+import logging
+
+import botfw as fw
+from botfw.etc.shared_orderbook import (
+    SharedOrderbookPublisher, SharedOrderbook, segment_name)
+from botfw.etc.shared_trade import SharedTradePublisher, SharedTrade
+
+BOOKS = [  # (exchange, symbol)
+    ('Bitflyer', 'FX_BTC_JPY'),
+    ('Bitbank', 'BTC/JPY'),
+]
+DEPTH = 20
+
+fw.setup_logger(logging.INFO)
+
+if sys.argv[1] == 'publish':
+    publishers = []
+    for exchange, symbol in BOOKS:
+        ex = getattr(fw, exchange)
+        name = segment_name(exchange, symbol)
+        ws = ex.Websocket()
+        publishers.append(SharedOrderbookPublisher(
+            ex.Orderbook(symbol, ws), name, DEPTH))
+        publishers.append(SharedTradePublisher(
+            ex.Trade(symbol, ws), name + '_trade'))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    for p in publishers:
+        p.close()  # 共有メモリを削除
+elif sys.argv[1] == 'read_trade':
+    exchange, symbol = BOOKS[0]
+    fw.test_trade(SharedTrade(segment_name(exchange, symbol) + '_trade'))
+else:
+    exchange, symbol = BOOKS[0]
+    fw.test_orderbook(SharedOrderbook(segment_name(exchange, symbol)))
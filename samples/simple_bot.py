@@ -62,6 +62,7 @@ ogm = ex.order_group_manager
 
 trade = ex.create_trade(SYMBOL)
 orderbook = ex.create_orderbook(SYMBOL)
+orderbook.enable_snapshot(10)  # 別スレッドから一貫した板を読むためのスナップショット
 og = ex.create_order_group(SYMBOL, 'test1')
 og.set_order_log(log)  # create_order, cancel_orderのログを表示
 # og.add_event_callback(lambda e: print(e.__dict__))  # 注文イベント取得時のコールバック関数
@@ -72,6 +73,7 @@ cmd_server = fw.CmdServer(50000)
 cmd_server.register_command(cmd.eval)
 cmd_server.register_command(cmd.exec)
 cmd_server.register_command(cmd.print, log=False)
+cmd_server.register_command(fw.latency_report, log=False)  # 遅延の統計
 
 
 # 約定データの遅延時間測定
@@ -96,8 +98,10 @@ if __name__ == '__main__':
         try:
             time.sleep(10)
 
-            best_bid = orderbook.bids()[0]
-            best_ask = orderbook.asks()[0]
+            # orderbook.bids()はwebsocketスレッドで更新中のため、スナップショットを参照
+            snapshot = orderbook.snapshot
+            best_bid = snapshot.best_bid
+            best_ask = snapshot.best_ask
 
             log.info(
                 f'ltp:{trade.ltp}, '
@@ -0,0 +1,96 @@
+import unittest
+
+from botfw.base.trade import TradeBase
+from botfw.etc.bar_builder import (
+    BarBuilder, TIME_BAR, TICK_BAR, VOLUME_BAR, DOLLAR_BAR,
+    TS, OPEN, HIGH, LOW, CLOSE, VOLUME, SIGNED_VOLUME, COUNT)
+
+
+class Api:
+    def __init__(self, trade):
+        self.trade = trade
+
+    def fetch_trades(self, symbol, since=None, limit=None):
+        # a live trade is received while fetching
+        self.trade._trigger_callback(3.5, 104, 1)
+        self.trade._trigger_callback(4.5, 105, -1)
+        return [{'timestamp': ts * 1000, 'price': p, 'amount': s,
+                 'side': side} for ts, p, s, side in [
+                     (1.0, 100, 1, 'buy'), (2.5, 102, 2, 'sell'),
+                     (3.5, 104, 1, 'buy')]]
+
+
+class SameTimeApi(Api):
+    def fetch_trades(self, symbol, since=None, limit=None):
+        # fills of the same millisecond are received and fetched in part
+        for t in [(3.5, 104, 1), (3.5, 103, -2), (3.5, 104, 1),
+                  (4.5, 105, -1)]:
+            self.trade._trigger_callback(*t)
+        return [{'timestamp': ts * 1000, 'price': p, 'amount': s,
+                 'side': side} for ts, p, s, side in [
+                     (2.5, 102, 2, 'sell'), (3.5, 104, 1, 'buy')]]
+
+
+class TestBarBuilder(unittest.TestCase):
+    '''test class of botfw.etc.bar_builder.BarBuilder'''
+
+    def setUp(self):
+        self.trade = TradeBase()
+        self.builder = BarBuilder(self.trade, [
+            (TIME_BAR, 2), (TICK_BAR, 2), (VOLUME_BAR, 3), (DOLLAR_BAR, 250)])
+        self.closed = []
+        self.builder.add_callback(
+            lambda bars, bar: self.closed.append((bars.type, bar)))
+
+    def test_bars(self):
+        for ts, p, s in [(0.5, 100, 1), (1.0, 101, -2), (1.5, 99, 1),
+                         (2.0, 102, 1), (5.0, 103, -1)]:
+            self.trade._trigger_callback(ts, p, s)
+
+        bars = self.builder.get(TIME_BAR, 2).last()
+        self.assertEqual(bars[:, TS].tolist(), [0, 2])
+        self.assertEqual(bars[0, [OPEN, HIGH, LOW, CLOSE]].tolist(),
+                         [100, 101, 99, 99])
+        self.assertEqual(bars[0, [VOLUME, SIGNED_VOLUME, COUNT]].tolist(),
+                         [4, 0, 3])
+        self.assertEqual(self.builder.get(TIME_BAR, 2).current[TS], 4)
+
+        self.assertEqual(self.builder.get(TICK_BAR, 2).count, 2)
+        self.assertEqual(self.builder.get(VOLUME_BAR, 3).last()[:, COUNT]
+                         .tolist(), [2, 3])
+        self.assertEqual(self.builder.get(DOLLAR_BAR, 250).count, 2)
+        self.assertEqual([t for t, _ in self.closed].count(TIME_BAR), 2)
+
+    def test_flush(self):
+        self.trade._trigger_callback(0.5, 100, 1)
+        self.builder.flush(now=2.5)  # within CLOSE_DELAY
+        bars = self.builder.get(TIME_BAR, 2)
+        self.assertEqual(bars.count, 0)
+        self.builder.flush(now=3.5)  # closed without a later trade
+        self.assertEqual(bars.count, 1)
+        self.assertEqual(self.closed[-1][0], TIME_BAR)
+
+        self.trade._trigger_callback(1.8, 101, 1)  # late trade
+        self.assertEqual(bars.current[TS], 2)
+        self.assertEqual(bars.count, 1)
+
+    def test_warmup(self):
+        self.builder.warmup(Api(self.trade), 'BTC/JPY')
+        bars = self.builder.get(TIME_BAR, 2)
+        self.assertEqual(bars.last()[:, CLOSE].tolist(), [100, 104])
+        self.assertEqual(bars.current[CLOSE], 105)
+        self.assertEqual(bars.last()[1, SIGNED_VOLUME], -1)
+        # only the bar closed by the live trade is notified
+        self.assertEqual([b[TS] for t, b in self.closed if t == TIME_BAR],
+                         [2])
+
+    def test_warmup_same_time(self):
+        self.builder.warmup(SameTimeApi(self.trade), 'BTC/JPY')
+        bars = self.builder.get(TIME_BAR, 2)
+        self.assertEqual(bars.last()[:, COUNT].tolist(), [4])
+        self.assertEqual(bars.last()[0, SIGNED_VOLUME], -2 + 1 - 2 + 1)
+        self.assertEqual(self.builder.get(TICK_BAR, 2).count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import time
+import unittest
+
+import botfw as fw
+from botfw.binance.websocket import (
+    BinanceStreamWebsocket, BinanceWebsocketManager)
+from botfw.etc.mock_exchange import MockExchangeServer, BINANCE
+
+from mock_helper import set_markets, set_depth_snapshot
+
+SYMBOLS = {'BTC/USDT': 'BTCUSDT', 'ETH/USDT': 'ETHUSDT',
+           'XRP/USDT': 'XRPUSDT'}
+
+
+class TestBinanceStream(unittest.TestCase):
+    '''test class of combined streams and BinanceWebsocketManager'''
+
+    def setUp(self):
+        set_markets(fw.Binance.Api, SYMBOLS)
+        self.server = MockExchangeServer(BINANCE, rate=50).start()
+        self.addCleanup(self.server.stop)
+        set_depth_snapshot(fw.Binance.Api, self.server.market)
+        ws_cls = type('Websocket', (BinanceStreamWebsocket,), {
+            'ENDPOINT': self.server.url + '/stream', 'MAX_STREAMS': 2})
+        self.manager = type('Manager', (BinanceWebsocketManager,), {
+            'Websocket': ws_cls, 'ASSIGN_TIMEOUT': 0.1})()
+        self.addCleanup(self.manager.stop)
+
+    def test_routing(self):
+        msgs = {}
+        for id_ in SYMBOLS.values():
+            for event in ('trade', 'depth'):
+                ch = f'{id_.lower()}@{event}'
+                ws = self.manager.connection(ch)
+                ws.subscribe(ch, msgs.setdefault(ch, []).append)
+        time.sleep(1)
+
+        self.assertEqual(len(self.manager.connections), 3)
+        for ch, ls in msgs.items():
+            symbol, _, event = ch.partition('@')
+            self.assertGreater(len(ls), 10)
+            for m in ls:
+                self.assertEqual(m['s'], symbol.upper())
+                self.assertEqual(
+                    m['e'], 'depthUpdate' if event == 'depth' else event)
+
+    def test_release(self):
+        trades = [fw.Binance.Trade(s, self.manager) for s in SYMBOLS]
+        self.assertEqual(len(self.manager.connections), 2)
+        self.assertIs(self.manager.connection('ethusdt@trade'), trades[1].ws)
+        trades[0].close()
+        trades[2].close()
+        time.sleep(0.2)
+
+        # slots of closed channels are reused
+        ob = fw.Binance.Orderbook('BTC/USDT', self.manager)
+        self.assertIs(ob.ws, trades[0].ws)
+        self.assertEqual(self.manager.connections, [ob.ws, trades[2].ws])
+        ob.close()
+
+        # stopped connections are forgotten
+        ob.ws.stop()
+        ws = self.manager.connection('btcusdt@trade')
+        self.assertEqual(self.manager.connections, [trades[2].ws])
+        self.assertIs(ws, trades[2].ws)
+
+    def test_resync(self):
+        # books of a reconnected stream fetch snapshots one by one
+        api = fw.Binance.Api.ccxt_instance()
+        depth, fetched = api.publicGetDepth, []
+
+        def fetch(params={}):
+            fetched.append(time.time())
+            return depth(params)
+
+        api.publicGetDepth = fetch
+        cls = type('Orderbook', (fw.Binance.Orderbook,),
+                   {'SNAPSHOT_INTERVAL': 0.1})
+        obs = [cls(s, self.manager) for s in SYMBOLS]
+        time.sleep(1)  # the lock may be held by books of other tests
+        self.assertEqual(len(fetched), 3)
+        for ob in obs:
+            self.assertGreater(len(ob.bids()), 0)
+
+        fetched.clear()
+        for ws in self.manager.connections:
+            ws.reconnect()
+        time.sleep(0.8)
+        self.assertEqual(len(fetched), 3)
+        for a, b in zip(fetched, fetched[1:]):
+            self.assertGreaterEqual(b - a, 0.1)
+
+        # closed books fetch no snapshot
+        fetched.clear()
+        for ob in obs:
+            ob.close()
+        for ws in self.manager.connections:
+            self.assertEqual(ws._WebsocketBase__after_open_cb, [])
+            ws.reconnect()
+        time.sleep(0.5)
+        self.assertEqual(fetched, [])
+
+    def test_rate_limit(self):
+        # subscriptions added one by one are merged under the rate limit
+        ws = self.manager.connection('btcusdt@trade')
+        ws.wait_open()
+        chs = [f'x{i}usdt@trade' for i in range(20)]
+        for ch in chs:
+            ws.subscribe(ch, lambda msg: None)
+            time.sleep(0.05)
+        time.sleep(0.5)
+
+        msgs = [json.loads(f) for f in self.server.received]
+        self.assertLess(len(msgs), 10)  # 20 commands without the limit
+        self.assertEqual(sum((m['params'] for m in msgs), []), chs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import time
+import asyncio
+import threading
+import unittest
+
+import botfw as fw
+from botfw.etc.callback import (
+    AsyncCallback, ConflatedCallback, BLOCK, DROP_OLDEST, CONFLATE)
+from botfw.etc.mock_exchange import MockExchangeServer, BITMEX
+
+from mock_helper import set_markets
+
+
+class TestAsyncCallback(unittest.TestCase):
+    '''test class of botfw.etc.callback.AsyncCallback'''
+
+    def setUp(self):
+        self.gate = threading.Event()  # blocks the worker until set
+        self.calls = []
+
+    def cb(self, *args):
+        self.gate.wait()
+        self.calls.append(args)
+
+    def run_calls(self, overflow, n=6):
+        acb = AsyncCallback(self.cb, maxlen=2, overflow=overflow)
+        self.addCleanup(acb.stop)
+        acb(0)
+        time.sleep(0.05)  # 0 is taken by the worker
+        for i in range(1, n):
+            acb(i)
+        return acb
+
+    def wait_delivered(self, acb, n):
+        self.gate.set()
+        for _ in range(100):
+            if acb.delivered >= n:
+                return
+            time.sleep(0.01)
+
+    def test_drop_oldest(self):
+        acb = self.run_calls(DROP_OLDEST)
+        self.wait_delivered(acb, 3)
+        self.assertEqual(self.calls, [(0,), (4,), (5,)])
+        self.assertEqual(acb.dropped, 3)
+        self.assertEqual(acb.max_depth, 2)
+
+    def test_conflate(self):
+        acb = self.run_calls(CONFLATE)
+        self.wait_delivered(acb, 3)
+        self.assertEqual(self.calls, [(0,), (1,), (5,)])
+        self.assertEqual(acb.conflated, 3)
+
+    def test_block(self):
+        acb = AsyncCallback(self.cb, maxlen=2, overflow=BLOCK)
+        self.addCleanup(acb.stop)
+        caller = threading.Thread(
+            target=lambda: [acb(i) for i in range(6)], daemon=True)
+        caller.start()
+        time.sleep(0.05)
+        self.assertTrue(caller.is_alive())  # waiting for room
+        self.gate.set()
+        caller.join(1)
+        self.wait_delivered(acb, 6)
+        self.assertEqual(self.calls, [(i,) for i in range(6)])
+        self.assertGreater(acb.blocked, 0)
+
+    def test_error(self):
+        acb = AsyncCallback(lambda: 1 / 0)
+        self.addCleanup(acb.stop)
+        acb.log.disabled = True
+        acb()
+        time.sleep(0.05)
+        self.assertEqual(acb.delivered, 1)  # worker survives
+
+
+class TestConflatedCallback(unittest.TestCase):
+    '''test class of botfw.etc.callback.ConflatedCallback'''
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.merged = []
+
+    def test_batch(self):
+        ccb = ConflatedCallback(self.merged.append, self.loop)
+
+        def frames(n):  # frames handled in the same loop iteration
+            for _ in range(n):
+                ccb()
+
+        self.loop.call_soon(frames, 3)
+        self.loop.call_soon(self.loop.call_soon, frames, 2)
+        self.loop.call_later(0.05, self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(self.merged, [3, 2])
+        self.assertEqual(ccb.stats(),
+                         {'pending': 0, 'delivered': 2, 'merged': 3})
+
+    def test_interval(self):
+        ccb = ConflatedCallback(self.merged.append, self.loop, 0.1)
+        for i in range(30):
+            self.loop.call_later(i * 0.01, ccb)
+        self.loop.call_later(0.5, self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(sum(self.merged), 30)
+        self.assertLessEqual(len(self.merged), 5)
+
+        ccb.stop()
+        ccb()
+        self.loop.call_later(0.05, self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(sum(self.merged), 30)  # not delivered after stop
+
+    def test_orderbook(self):
+        set_markets(fw.Bitmex.Api, {'BTC/USD': 'XBTUSD'})
+        server = MockExchangeServer(BITMEX, rate=1000).start()
+        ws = server.create_websocket(fw.Bitmex.Websocket)
+        ob = fw.Bitmex.Orderbook('BTC/USD', ws)
+        n = [0]
+        ob.add_callback(lambda: n.__setitem__(0, n[0] + 1))
+        ob.wait_initialized()
+        ccb = ob.add_conflated_callback(self.merged.append, 0.1)
+        time.sleep(1)
+        ob.remove_callback(ccb)
+        ws.stop()
+        server.stop()
+
+        self.assertLessEqual(ccb.delivered, 12)
+        self.assertGreater(sum(self.merged), ccb.delivered * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from botfw.base.orderbook import OrderbookBase, BID, ASK
+from botfw.etc.consolidated_orderbook import ConsolidatedOrderbook
+
+from orderbook_helper import update_level
+
+
+class ListOrderbook(OrderbookBase):
+    # replaced by each message like LiquidOrderbook and GmocoinOrderbook
+    def init(self):
+        self.ls_bids, self.ls_asks = [], []
+
+    def bids(self):
+        return self.ls_bids
+
+    def asks(self):
+        return self.ls_asks
+
+
+class TestConsolidatedOrderbook(unittest.TestCase):
+    '''test class of botfw.etc.consolidated_orderbook'''
+
+    def replace(self, ob):
+        ob.ls_bids = [(p, 1.0) for p in range(99, 89, -random.randint(1, 3))]
+        ob.ls_asks = [(p, 1.0) for p in range(101, 111, random.randint(1, 3))]
+        ob._notify_book()
+        ob._trigger_callback()
+
+    def merged(self, books):
+        bids, asks = [], []
+        for venue, ob in books.items():
+            bids += [[p, s, venue] for p, s in ob.bids()]
+            asks += [[p, s, venue] for p, s in ob.asks()]
+        bids.sort(key=lambda x: (-x[0], x[2]))
+        asks.sort(key=lambda x: (x[0], x[2]))
+        return bids, asks
+
+    def test_merge(self):
+        books = {'a': OrderbookBase(), 'b': OrderbookBase(),
+                 'c': ListOrderbook()}
+        update_level(books['a'], BID, 95, 1)
+        cob = ConsolidatedOrderbook(books)
+        updated = []
+        cob.add_callback(updated.append)
+
+        for _ in range(2000):
+            venue = random.choice('abc')
+            if venue == 'c':
+                self.replace(books[venue])
+            else:
+                side = random.choice((BID, ASK))
+                price = random.randrange(90, 100) + (0 if side == BID else 10)
+                update_level(books[venue], side, price, random.choice((0, 1)))
+            self.assertEqual(updated[-1], venue)
+
+            bids, asks = self.merged(books)
+            self.assertEqual(cob.bids(), bids)
+            self.assertEqual(cob.asks(), asks)
+            if bids and asks:
+                self.assertEqual(cob.best_bid, tuple(bids[0]))
+                self.assertEqual(cob.depth(ASK, asks[0][0])[0], sum(
+                    s for p, s, _ in asks if p == asks[0][0]))
+
+        cob.remove_venue('c')
+        self.assertNotIn('c', [v for _, _, v in cob.bids() + cob.asks()])
+        cob.close()
+        self.assertEqual((cob.bids(), cob.asks()), ([], []))
+
+    def test_impact_price(self):
+        a, b = OrderbookBase(), OrderbookBase()
+        cob = ConsolidatedOrderbook({'a': a, 'b': b})
+        update_level(a, ASK, 100, 1)
+        update_level(b, ASK, 101, 2)
+        self.assertEqual(cob.impact_price(ASK, 2), (101, 100.5))
+        self.assertEqual(cob.depth(ASK, 101), (3, {'a': 1, 'b': 2}))
+        self.assertIsNone(cob.impact_price(ASK, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
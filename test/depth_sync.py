@@ -0,0 +1,83 @@
+import logging
+import unittest
+
+from botfw.base.depth_sync import DepthSync, CONTIGUOUS, MONOTONIC
+
+
+class Book:
+    def __init__(self, mode):
+        self.log = logging.getLogger('Book')
+        self.log.disabled = True
+        self.sync = DepthSync(self, mode)
+        self.applied = []
+        self.resyncs = 0
+
+    def _diff_ids(self, diff):
+        return diff
+
+    def _apply_diff(self, diff):
+        self.applied.append(diff[1])
+
+    def _resync(self):
+        self.resyncs += 1
+
+
+class TestDepthSync(unittest.TestCase):
+    '''test class of botfw.base.depth_sync.DepthSync'''
+
+    def test_contiguous(self):
+        b = Book(CONTIGUOUS)
+        for i in range(1, 6):
+            self.assertFalse(b.sync.on_diff((i * 10 - 9, i * 10, None)))
+        b.sync.on_snapshot(25, lambda: None)  # 1-20 are stale
+        self.assertEqual(b.applied, [30, 40, 50])
+        self.assertTrue(b.sync.on_diff((51, 60, None)))
+        self.assertFalse(b.sync.on_diff((71, 80, None)))  # gap
+        self.assertEqual((b.resyncs, b.sync.synced), (1, False))
+
+    def test_snapshot_gap(self):
+        b = Book(CONTIGUOUS)
+        b.sync.on_diff((31, 40, 30))
+        b.sync.on_snapshot(20, lambda: None)
+        self.assertEqual((b.applied, b.resyncs), ([], 1))
+
+    def test_prev_id(self):
+        b = Book(CONTIGUOUS)
+        b.sync.on_diff((1, 10, 0))
+        b.sync.on_diff((11, 20, 10))
+        b.sync.on_snapshot(15, lambda: None)
+        self.assertEqual(b.applied, [20])
+        self.assertTrue(b.sync.on_diff((25, 30, 20)))  # pu matches
+        self.assertFalse(b.sync.on_diff((35, 40, 33)))
+        self.assertEqual(b.resyncs, 1)
+
+    def test_monotonic(self):
+        b = Book(MONOTONIC)
+        b.sync.on_snapshot(10, lambda: None)
+        self.assertFalse(b.sync.on_diff((5, 5, None)))
+        self.assertTrue(b.sync.on_diff((20, 20, None)))
+        self.assertEqual((b.applied, b.resyncs), ([20], 0))
+
+    def test_monotonic_same_id(self):
+        # several diffs may share a sequence or timestamp, but a diff of
+        # the snapshot id is included in the snapshot
+        b = Book(MONOTONIC)
+        b.sync.on_snapshot(10, lambda: None)
+        self.assertFalse(b.sync.on_diff((10, 10, None)))
+        self.assertTrue(b.sync.on_diff((20, 20, None)))
+        self.assertTrue(b.sync.on_diff((20, 20, None)))
+        self.assertFalse(b.sync.on_diff((19, 19, None)))
+        self.assertEqual(b.applied, [20, 20])
+
+    def test_stale_snapshot(self):
+        b = Book(MONOTONIC)
+        book = []
+        self.assertTrue(b.sync.on_snapshot(10, lambda: book.append(10)))
+        self.assertTrue(b.sync.on_diff((12, 12, None)))
+        self.assertFalse(b.sync.on_snapshot(11, lambda: book.append(11)))
+        self.assertEqual((book, b.applied, b.sync.last_id), ([10], [12], 12))
+        self.assertTrue(b.sync.on_snapshot(12, lambda: book.append(12)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+from random import expovariate
+import unittest
+
+from botfw.etc.latency import LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    '''test class of botfw.etc.latency.LatencyHistogram'''
+
+    def test_percentile(self):
+        h = LatencyHistogram()
+        values = [expovariate(1 / 0.005) for _ in range(100000)]
+        for v in values:
+            h.record(v)
+        values.sort()
+        for p in (1, 50, 90, 99, 99.9):
+            ans = values[int(len(values) * p / 100)]
+            res = h.percentile(p)
+            self.assertAlmostEqual(ans, res, delta=ans / h.HALF + h.UNIT)
+        self.assertEqual(h.percentile(100), values[-1])
+        self.assertEqual(h.count, len(values))
+
+    def test_out_of_range(self):
+        h = LatencyHistogram()
+        self.assertIsNone(h.percentile(50))
+        h.record(-0.001)
+        h.record(1e9)
+        self.assertEqual(h.negative, 1)
+        self.assertLess(h.percentile(0), h.UNIT)  # counted as 0
+        self.assertEqual(h.percentile(100), 1e9)
+        self.assertEqual(len(h.counts), h.SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import json
+import time
+import unittest
+
+import botfw as fw
+from botfw.base.websocket import RECONNECT, RESUBSCRIBE
+from botfw.etc.mock_exchange import MockExchangeServer, BITFLYER, BITMEX
+
+from mock_helper import set_markets
+
+
+class TestMockExchange(unittest.TestCase):
+    '''end-to-end test of feeds with botfw.etc.mock_exchange'''
+
+    def test_bitflyer_trade(self):
+        set_markets(fw.Bitflyer.Api, {'FX_BTC_JPY': 'FX_BTC_JPY'})
+        server = MockExchangeServer(BITFLYER, rate=200).start()
+        ws = server.create_websocket(fw.Bitflyer.Websocket)
+        trade = fw.Bitflyer.Trade('FX_BTC_JPY', ws)
+        trades = []
+        trade.add_callback(lambda *t: trades.append(t))
+        time.sleep(1)
+        ws.stop()
+        server.stop()
+
+        self.assertGreater(len(trades), 50)
+        s = list(ws.latency.summary().values())[0]['feed']
+        self.assertEqual(s['count'], len(trades))
+
+    def test_shared_channel(self):
+        # feed latency is recorded once per message, not per subscriber
+        set_markets(fw.Bitflyer.Api, {'FX_BTC_JPY': 'FX_BTC_JPY'})
+        server = MockExchangeServer(BITFLYER, rate=200).start()
+        ws = server.create_websocket(fw.Bitflyer.Websocket)
+        t1 = fw.Bitflyer.Trade('FX_BTC_JPY', ws)
+        t2 = fw.Bitflyer.Trade('FX_BTC_JPY', ws)
+        trades = []
+        t1.add_callback(lambda *t: trades.append(t))
+        t2.add_callback(lambda *t: None)
+        time.sleep(1)
+        ws.stop()
+        server.stop()
+
+        s = list(ws.latency.summary().values())[0]
+        self.assertGreater(len(trades), 50)
+        self.assertEqual(s['feed']['count'], len(trades))
+        self.assertEqual(s['callback']['count'], len(trades))
+
+    def test_refcount(self):
+        # a channel is subscribed once and unsubscribed by the last subscriber
+        set_markets(fw.Bitflyer.Api, {'FX_BTC_JPY': 'FX_BTC_JPY'})
+        server = MockExchangeServer(BITFLYER, rate=200).start()
+        ws = server.create_websocket(fw.Bitflyer.Websocket)
+        ws.wait_open()
+        t1 = fw.Bitflyer.Trade('FX_BTC_JPY', ws)
+        t2 = fw.Bitflyer.Trade('FX_BTC_JPY', ws)
+        trades = []
+        t2.add_callback(lambda *t: trades.append(t))
+        time.sleep(0.5)
+
+        def methods():
+            return [json.loads(f)['method'] for f in server.received]
+
+        self.assertEqual(methods(), ['subscribe'])
+        t1.close()
+        time.sleep(0.5)
+        self.assertEqual(methods(), ['subscribe'])
+        self.assertGreater(len(trades), 20)
+
+        t2.close()
+        time.sleep(0.5)
+        n = len(trades)
+        time.sleep(0.5)
+        ws.stop()
+        server.stop()
+
+        self.assertEqual(methods(), ['subscribe', 'unsubscribe'])
+        self.assertEqual(len(trades), n)
+        self.assertEqual(ws._ch_cb, {})
+
+    def test_subscriber_error(self):
+        # an exception of a subscriber does not skip the others
+        set_markets(fw.Bitflyer.Api, {'FX_BTC_JPY': 'FX_BTC_JPY'})
+        server = MockExchangeServer(BITFLYER, rate=200).start()
+        ws = server.create_websocket(fw.Bitflyer.Websocket)
+        msgs = []
+
+        def error(msg):
+            raise Exception('subscriber error')
+
+        ch = 'lightning_executions_FX_BTC_JPY'
+        with self.assertLogs(ws.log, 'ERROR'):
+            ws.subscribe(ch, error)
+            ws.subscribe(ch, msgs.append)
+            time.sleep(0.5)
+            ws.stop()
+            time.sleep(0.1)
+        server.stop()
+
+        self.assertGreater(len(msgs), 20)
+        s = ws.latency.summary()[ch]
+        self.assertEqual(s['callback']['count'], len(msgs))
+
+    def test_watchdog(self):
+        # a stalled channel is resubscribed or reconnected
+        set_markets(fw.Bitflyer.Api, {'FX_BTC_JPY': 'FX_BTC_JPY'})
+        ch = 'lightning_executions_FX_BTC_JPY'
+        for action in (RESUBSCRIBE, RECONNECT):
+            server = MockExchangeServer(BITFLYER, rate=200).start()
+            ws = server.create_websocket(fw.Bitflyer.Websocket)
+            ws.WATCHDOG_INTERVAL = 0.1
+            ws.RECONNECT_DELAY_MIN = 0.01
+            ws.set_inactivity_timeout(ch, 0.3, action)
+            msgs = []
+            ws.subscribe(ch, msgs.append)
+            ws.wait_open()
+            time.sleep(0.3)
+
+            server.stall(ch)
+            time.sleep(0.3)
+            n = len(msgs)
+            time.sleep(1)
+            ws.stop()
+            server.stop()
+
+            self.assertGreater(len(msgs), n + 20)  # fed again
+            methods = [json.loads(f)['method'] for f in server.received]
+            if action == RESUBSCRIBE:
+                self.assertEqual(
+                    methods, ['subscribe', 'unsubscribe', 'subscribe'])
+                self.assertEqual(ws.reconnect_count, 0)
+            else:
+                self.assertEqual(methods, ['subscribe', 'subscribe'])
+                self.assertEqual(ws.reconnect_count, 1)
+
+    def test_bitmex_orderbook(self):
+        set_markets(fw.Bitmex.Api, {'BTC/USD': 'XBTUSD'})
+        server = MockExchangeServer(BITMEX, rate=200).start()
+        ws = server.create_websocket(fw.Bitmex.Websocket)
+        ob = fw.Bitmex.Orderbook('BTC/USD', ws)
+        n = [0]
+        ob.add_callback(lambda: n.__setitem__(0, n[0] + 1))
+        time.sleep(1)
+        ws.stop()
+        server.stop()
+
+        self.assertGreater(n[0], 50)
+        self.assertEqual(len(ob.bids()), 25)
+        self.assertEqual(len(ob.asks()), 25)
+        self.assertLess(ob.bids()[0][0], ob.asks()[0][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+def set_markets(api, markets):
+    # prime ccxt markets of api class without network access.
+    # markets: {symbol: market id}
+    ccxt_ = api._ccxt_class()
+    ls = []
+    for symbol, id_ in markets.items():
+        base, _, quote = symbol.partition('/')
+        ls.append({'id': id_, 'symbol': symbol, 'base': base, 'quote': quote})
+    ccxt_.set_markets(ls)
+    api._instance = ccxt_
+
+
+def set_depth_snapshot(api, market):
+    # serve REST depth snapshots of Binance from MockMarket
+    def depth(params={}):
+        bids, asks = market.book()
+        return {'lastUpdateId': market.update_id,
+                'bids': [[str(p), str(s)] for p, s in bids],
+                'asks': [[str(p), str(s)] for p, s in asks]}
+
+    ccxt_ = api.ccxt_instance()
+    ccxt_.publicGetDepth = ccxt_.fapiPublicGetDepth = depth
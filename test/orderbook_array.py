@@ -0,0 +1,34 @@
+import unittest
+
+from botfw.base.orderbook import OrderbookBase, BID, ASK
+
+
+class TestOrderbookArray(unittest.TestCase):
+    '''test class of botfw.etc.orderbook_array.OrderbookArray'''
+
+    def setUp(self):
+        self.ob = OrderbookBase()
+        for p, s in [(100, 1), (99, 2), (98, 3)]:
+            self.ob.sd_bids[-p] = [p, s]
+        for p, s in [(101, 1), (102, 2), (103, 3)]:
+            self.ob.sd_asks[p] = [p, s]
+        self.a = self.ob.enable_array(3)
+
+    def test_depth(self):
+        self.assertEqual(self.a.cumulative_depth(BID).tolist(), [1, 3, 6])
+        self.assertEqual(self.a.impact_price(ASK, 2), 102)
+        self.assertIsNone(self.a.impact_price(ASK, 7))
+        self.assertAlmostEqual(self.a.vwap(ASK, 2), 101.5)
+        self.assertAlmostEqual(self.a.vwap(BID, 4), (100 + 99 * 2 + 98) / 4)
+        self.assertEqual(self.a.imbalance(), 0)
+
+    def test_refresh(self):
+        del self.ob.sd_asks[101]
+        self.ob.sd_bids[-100][1] = 3
+        self.ob._trigger_callback()
+        self.assertEqual(self.a.asks().tolist(), [[102, 2], [103, 3]])
+        self.assertAlmostEqual(self.a.imbalance(1), (3 - 2) / (3 + 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
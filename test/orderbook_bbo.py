@@ -0,0 +1,36 @@
+import unittest
+
+from botfw.base.orderbook import OrderbookBase, BID, ASK
+
+from orderbook_helper import update_level
+
+
+class TestOrderbookBbo(unittest.TestCase):
+    '''test class of OrderbookBase.add_bbo_callback'''
+
+    def test_bbo(self):
+        ob = OrderbookBase()
+        bbo = []
+        ob.add_bbo_callback(lambda bid, ask: bbo.append((bid, ask)))
+
+        update_level(ob, BID, 100, 1)
+        update_level(ob, ASK, 101, 1)
+        update_level(ob, BID, 99, 1)  # not the best level
+        update_level(ob, ASK, 102, 3)
+        ob._trigger_callback()  # no change
+        self.assertEqual(bbo, [((100, 1), None), ((100, 1), (101, 1))])
+
+        ob.sd_bids[-100][1] = 2  # size changed in place like exchanges do
+        ob._trigger_callback()
+        update_level(ob, ASK, 101, 0)
+        self.assertEqual(bbo[2:], [((100, 2), (101, 1)), ((100, 2), (102, 3))])
+        self.assertEqual((ob.best_bid, ob.best_ask), ((100, 2), (102, 3)))
+
+        update_level(ob, BID, 100, 0)
+        update_level(ob, BID, 99, 0)
+        self.assertEqual(bbo[-1], (None, (102, 3)))
+        self.assertEqual(len(bbo), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import math
+import random
+import unittest
+
+from botfw.base.orderbook import OrderbookBase, BID, ASK
+
+from orderbook_helper import update_level
+
+
+class TestBucketOrderbook(unittest.TestCase):
+    '''test class of botfw.etc.orderbook_bucket.BucketOrderbook'''
+
+    def aggregate(self, levels, bucket, rnd):
+        book = {}
+        for p, s in levels:
+            b = rnd(p / bucket + (1e-9 if rnd is math.floor else -1e-9))
+            book[b * bucket] = book.get(b * bucket, 0) + s
+        return book
+
+    def test_bucket_view(self):
+        ob = OrderbookBase()
+        for i in range(10):
+            update_level(ob, BID, 900 + i * 7.5, 1)
+        view = ob.bucket_view(50)
+        self.assertIs(ob.bucket_view(50), view)
+
+        for n in range(3000):
+            side = random.choice((BID, ASK))
+            price = random.randrange(800, 1000) * 0.5 + \
+                (0 if side == BID else 100)
+            update_level(ob, side, price, random.choice((0, 0.1, 0.3, 2)))
+            if n == 1500:
+                ob.init()
+
+            for levels, sd, rnd, rev in (
+                    (ob.bids(), view.bids(), math.floor, True),
+                    (ob.asks(), view.asks(), math.ceil, False)):
+                book = self.aggregate(levels, 50, rnd)
+                self.assertEqual([p for p, _ in sd],
+                                 sorted(book, reverse=rev))
+                for p, s in sd:
+                    self.assertAlmostEqual(s, book[p])
+
+        view.close()
+        self.assertEqual(ob.level_cb, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from botfw.base.orderbook import OrderbookBase, BID, ASK
+from botfw.etc.orderbook_log import OrderbookDeltaLog, load_book
+
+from orderbook_helper import update_level
+
+
+class TestOrderbookDeltaLog(unittest.TestCase):
+    '''test class of botfw.etc.orderbook_log.OrderbookDeltaLog'''
+
+    def setUp(self):
+        self.now = 1600000000.0
+        patcher = mock.patch('botfw.etc.orderbook_log.time.time',
+                             lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_updates(self, log, n):
+        snapshots = []
+        for _ in range(n):
+            self.now += 0.1
+            side = random.choice((BID, ASK))
+            price = random.randrange(90, 100) + (0 if side == BID else 10)
+            update_level(log.ob, side, price, random.choice((0, 1, 2)))
+            if random.random() < 0.01:
+                log.ob.init()
+            snapshots.append((self.now, list(log.ob.bids()),
+                              list(log.ob.asks())))
+        return snapshots
+
+    def test_book_at(self):
+        log = OrderbookDeltaLog(
+            OrderbookBase(), capacity=500, keyframe_interval=5)
+        snapshots = self.run_updates(log, 2000)
+        self.assertIsNone(log.book_at(snapshots[0][0]))
+        for ts, bids, asks in snapshots[-300:]:
+            self.assertEqual(log.book_at(ts), (bids, asks))
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'ob')
+            log = OrderbookDeltaLog(
+                OrderbookBase(), capacity=100, keyframe_interval=5,
+                path=path, file_size=2000)
+            snapshots = self.run_updates(log, 1000)
+            log.close()
+            self.assertGreater(len(os.listdir(d)), 1)
+            for ts, bids, asks in snapshots[::7]:
+                self.assertEqual(load_book(path, ts), (bids, asks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,12 @@
+from botfw.base.orderbook import BID
+
+
+def update_level(ob, side, price, size):
+    # apply a level change to OrderbookBase like exchange handlers do
+    sd, sign = (ob.sd_bids, -1) if side == BID else (ob.sd_asks, 1)
+    if size:
+        sd[price * sign] = [price, size]
+    else:
+        sd.pop(price * sign, None)
+    ob._notify_level(side, price, size)
+    ob._trigger_callback()
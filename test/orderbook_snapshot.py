@@ -0,0 +1,31 @@
+import unittest
+
+from botfw.base.orderbook import OrderbookBase
+
+
+class TestOrderbookSnapshot(unittest.TestCase):
+    '''test class of OrderbookBase.enable_snapshot'''
+
+    def test_snapshot(self):
+        ob = OrderbookBase()
+        ob.enable_snapshot(2)
+        for p in (99, 98, 97):
+            ob.sd_bids[-p] = [p, 1.0]
+        ob.sd_asks[101] = [101, 2.0]
+        ob._trigger_callback()
+
+        s = ob.snapshot
+        self.assertEqual(s.bids, ((99, 1.0), (98, 1.0)))
+        self.assertEqual(s.best_ask, (101, 2.0))
+        self.assertFalse(ob.changed_since(s.version))
+
+        ob.sd_bids[-99][1] = 3.0  # published snapshot is not modified
+        ob._trigger_callback()
+        self.assertEqual(s.best_bid, (99, 1.0))
+        self.assertTrue(ob.changed_since(s.version))
+        self.assertEqual(ob.snapshot.best_bid, (99, 3.0))
+        self.assertEqual(ob.snapshot.version, s.version + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
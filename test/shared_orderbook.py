@@ -0,0 +1,52 @@
+import time
+import unittest
+from multiprocessing import shared_memory
+
+from botfw.base.orderbook import OrderbookBase
+from botfw.etc.shared_orderbook import (
+    SharedOrderbookPublisher, SharedOrderbook)
+
+
+class TestSharedOrderbook(unittest.TestCase):
+    '''test class of botfw.etc.shared_orderbook'''
+
+    def test_publish(self):
+        ob = OrderbookBase()
+        pub = SharedOrderbookPublisher(ob, f'botfw_test_{time.time()}', 3)
+        self.addCleanup(pub.close)
+        reader = SharedOrderbook(pub.name)
+        self.addCleanup(reader.close)
+        updated = []
+        reader.add_callback(lambda: updated.append(list(reader.bids())))
+
+        for i in range(5):
+            ob.sd_bids[-100 + i] = [100 - i, 1.0 + i]
+            ob.sd_asks[101 + i] = [101 + i, 2.0]
+            ob._trigger_callback()
+            time.sleep(0.05)
+
+        self.assertEqual(updated[-1], [(100, 1.0), (99, 2.0), (98, 3.0)])
+        self.assertEqual(reader.asks(), [(101, 2.0), (102, 2.0), (103, 2.0)])
+        self.assertGreaterEqual(len(updated), 5)
+
+    def test_stale_segment(self):
+        # a segment of other depth is left by a crashed publisher
+        name = f'botfw_test_{time.time()}'
+        stale = shared_memory.SharedMemory(name, create=True, size=64)
+        stale.close()
+        ob = OrderbookBase()
+        ob.sd_bids[-100] = [100, 1.0]
+        pub = SharedOrderbookPublisher(ob, name, 3)
+        self.addCleanup(pub.close)
+        reader = SharedOrderbook(name)
+        self.addCleanup(reader.close)
+        time.sleep(0.05)
+        self.assertEqual(reader.bids(), [(100, 1.0)])
+
+    def test_timeout(self):
+        with self.assertRaises(Exception):
+            SharedOrderbook(f'botfw_test_{time.time()}', timeout=0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import time
+import unittest
+from multiprocessing import shared_memory
+
+from botfw.base.trade import TradeBase
+from botfw.etc.shared_trade import (
+    SharedTradePublisher, SharedTrade, segment_size)
+
+
+class TestSharedTrade(unittest.TestCase):
+    '''test class of botfw.etc.shared_trade'''
+
+    def test_ring(self):
+        trade = TradeBase()
+        pub = SharedTradePublisher(trade, f'botfw_test_{time.time()}', 8)
+        self.addCleanup(pub.close)
+        reader = SharedTrade(pub.name, interval=0.01)
+        self.addCleanup(reader.close)
+        trades = []
+        reader.add_callback(lambda *t: trades.append(t))
+
+        for i in range(20):  # consumed as it is written
+            trade._trigger_callback(i, 100 + i, 1)
+            if i % 4 == 3:
+                time.sleep(0.05)
+        time.sleep(0.05)
+        self.assertEqual(trades, [(i, 100 + i, 1) for i in range(20)])
+        self.assertEqual(reader.ltp, 119)
+
+        reader.close()
+        reader = SharedTrade(pub.name, interval=0.2)
+        self.addCleanup(reader.close)
+        reader.add_callback(lambda *t: trades.append(t))
+        for i in range(20, 40):  # overwritten before read
+            trade._trigger_callback(i, 100 + i, 1)
+        time.sleep(0.3)
+        self.assertEqual(trades[20:], [(i, 100 + i, 1) for i in range(33, 40)])
+        self.assertEqual(reader.overrun, 13)
+
+    def test_stale_segment(self):
+        # a segment of other capacity is left by a crashed publisher
+        name = f'botfw_test_{time.time()}'
+        stale = shared_memory.SharedMemory(
+            name, create=True, size=segment_size(4))
+        stale.close()
+        trade = TradeBase()
+        pub = SharedTradePublisher(trade, name, 8)
+        self.addCleanup(pub.close)
+        reader = SharedTrade(name, interval=0.01)
+        self.addCleanup(reader.close)
+        trades = []
+        reader.add_callback(lambda *t: trades.append(t))
+        for i in range(7):  # more than the stale capacity
+            trade._trigger_callback(i, 100 + i, 1)
+        time.sleep(0.05)
+        self.assertEqual(trades, [(i, 100 + i, 1) for i in range(7)])
+        self.assertEqual(reader.capacity, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
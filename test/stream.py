@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import types
+import unittest
+
+from botfw.base.trade import TradeBase
+from botfw.base.orderbook import OrderbookBase
+from botfw.base.order import OrderGroupBase
+from botfw.etc.stream import CallbackStream
+
+
+def in_thread(fn, *args):
+    t = threading.Thread(target=fn, args=args)
+    t.start()
+    t.join()
+
+
+class OrderManager:
+    def __init__(self):
+        self.handler = None
+        self.thread = None
+
+    def create_order(self, symbol, type_, side, amount, price, params,
+                     handler, order_log, sync):
+        self.handler = handler
+        self.thread = threading.get_ident()
+        return types.SimpleNamespace(id='order_1', sync=sync)
+
+
+class TestStream(unittest.TestCase):
+    '''test class of the asyncio streaming API'''
+
+    def test_callback_stream(self):
+        async def run():
+            s = CallbackStream(maxlen=2)
+            s.put(1)
+            in_thread(s.put, 2)
+            in_thread(s.put, 3)
+            await asyncio.sleep(0.01)
+            return [await s.get(), await s.get()], s.dropped
+
+        self.assertEqual(asyncio.run(run()), ([(2,), (3,)], 1))
+
+    def test_trade_stream(self):
+        trade = TradeBase()
+
+        async def run():
+            trades = []
+            gen = trade.stream()
+            asyncio.get_running_loop().call_soon(
+                in_thread, lambda: [trade._trigger_callback(i, 100, 1)
+                                    for i in range(3)])
+            async for t in gen:
+                trades.append(t)
+                if len(trades) == 3:
+                    break
+            await gen.aclose()
+            return trades
+
+        self.assertEqual(asyncio.run(run()), [(i, 100, 1) for i in range(3)])
+        self.assertEqual(trade.cb, [])  # removed when the stream is closed
+
+    def test_orderbook_updates(self):
+        ob = OrderbookBase()
+
+        async def run():
+            gen = ob.updates()
+            task = asyncio.ensure_future(gen.__anext__())
+            await asyncio.sleep(0)  # subscribed
+            for _ in range(3):
+                ob._trigger_callback()
+            first = await task
+            await asyncio.sleep(0.01)
+            self.assertEqual(len(ob.cb), 1)
+            await gen.aclose()
+            return first
+
+        self.assertIs(asyncio.run(run()), ob)
+        self.assertEqual(ob.cb, [])
+
+    def test_order_group(self):
+        manager = types.SimpleNamespace(order_manager=OrderManager())
+        group = OrderGroupBase(manager, 'BTC/JPY', 'test')
+        event = types.SimpleNamespace(type='open')
+
+        async def run():
+            o = await group.create_order_async('limit', 'buy', 1, 100)
+            gen = group.events()
+            task = asyncio.ensure_future(gen.__anext__())
+            await asyncio.sleep(0)
+            in_thread(manager.order_manager.handler, event)
+            e = await task
+            await gen.aclose()
+            return o, e
+
+        o, e = asyncio.run(run())
+        self.assertEqual((o.sync, o.group_name), (True, 'test'))
+        self.assertNotEqual(  # not blocking the event loop
+            manager.order_manager.thread, threading.get_ident())
+        self.assertIs(e, event)
+        self.assertEqual(group.event_cb, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
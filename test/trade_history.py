@@ -0,0 +1,42 @@
+import unittest
+
+from botfw.base.trade import TradeBase
+
+
+class TestTradeHistory(unittest.TestCase):
+    '''test class of botfw.etc.trade_history.TradeHistory'''
+
+    def setUp(self):
+        self.trade = TradeBase()
+        self.h = self.trade.enable_history(4)
+        for ts, p, s in [(1, 100, 1), (2, 101, -2), (3, 103, 1),
+                         (4, 102, 3), (5, 99, -1)]:
+            self.trade._trigger_callback(ts, p, s)
+
+    def test_ring(self):
+        self.assertIs(self.trade.enable_history(), self.h)
+        self.assertEqual(self.h.last()[:, 0].tolist(), [2, 3, 4, 5])
+        self.assertEqual(self.h.last(2)[:, 1].tolist(), [102, 99])
+        self.assertEqual(len(self.h.last(10)), 4)
+
+    def test_full_ring(self):
+        # the oldest row of the whole ring is overwritten by the next trade
+        a, w = self.h.last(), self.h.window(10, 5.5)
+        self.trade._trigger_callback(6, 98, 1)
+        self.assertEqual(a[:, 0].tolist(), [2, 3, 4, 5])
+        self.assertEqual(w[:, 0].tolist(), [2, 3, 4, 5])
+        self.assertEqual(self.h.last(3)[:, 0].tolist(), [4, 5, 6])
+
+    def test_window(self):
+        now = 5.5
+        self.assertEqual(self.h.count_in(3, now), 3)
+        self.assertEqual(self.h.volume(3, now), 5)
+        self.assertEqual(self.h.signed_volume(3, now), 3)
+        self.assertAlmostEqual(self.h.vwap(3, now), (103 + 102 * 3 + 99) / 5)
+        self.assertEqual(self.h.high(10, now), 103)
+        self.assertEqual(self.h.low(10, now), 99)
+        self.assertIsNone(self.h.vwap(0.1, now))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import time
+import unittest
+
+import botfw as fw
+from botfw.etc.mock_exchange import (
+    MockExchangeServer, BITMEX, BYBIT, BINANCE)
+
+
+def nop(*args):
+    pass
+
+
+class TestWebsocketQueue(unittest.TestCase):
+    '''test class of the outbound queue of WebsocketBase'''
+
+    def connect(self, protocol, cls, path=''):
+        server = MockExchangeServer(protocol).start()
+        self.addCleanup(server.stop)
+        ws = server.create_websocket(cls, path=path)
+        self.addCleanup(ws.stop)
+        ws.wait_open()
+        return server, ws
+
+    def quiet(self, ws):
+        ws.log.disabled = True
+        self.addCleanup(setattr, ws.log, 'disabled', False)
+
+    def on_loop(self, ws, fn):
+        # queued in one loop iteration, before the writer wakes up
+        ws._loop.call_soon_threadsafe(fn)
+        time.sleep(0.3)
+
+    def subscribe(self, ws, chs):
+        self.on_loop(ws, lambda: [ws.subscribe(ch, nop) for ch in chs])
+
+    def commands(self, server, key):
+        return [m for m in map(json.loads, server.received) if key in m]
+
+    def test_bitmex_merge(self):
+        server, ws = self.connect(BITMEX, fw.Bitmex.Websocket)
+        self.subscribe(ws, [f'table{i}' for i in range(70)])
+        msgs = self.commands(server, 'op')
+        self.assertEqual([len(m['args']) for m in msgs], [50, 20])
+        # replies are matched by the merged requests
+        self.assertEqual(list(ws._request_table), list(server.received))
+
+    def test_bybit_merge(self):
+        server, ws = self.connect(BYBIT, fw.Bybit.Websocket)
+        self.subscribe(ws, [f'trade.X{i}' for i in range(70)])
+        msgs = self.commands(server, 'op')
+        self.assertEqual([len(m['args']) for m in msgs], [50, 20])
+
+    def test_binance_merge(self):
+        server, ws = self.connect(BINANCE, fw.Binance.Websocket, '/ws')
+        self.subscribe(ws, [f'x{i}usdt@trade' for i in range(250)])
+        time.sleep(1 / ws.SEND_RATE_LIMIT)
+        msgs = self.commands(server, 'method')
+        self.assertEqual([len(m['params']) for m in msgs], [200, 50])
+        self.assertEqual(list(ws._request_table), [m['id'] for m in msgs])
+
+    def test_plain_send(self):
+        # messages out of the request table are sent as they are
+        server, ws = self.connect(BITMEX, fw.Bitmex.Websocket)
+        self.quiet(ws)  # replies to unknown requests are logged
+        self.on_loop(ws, lambda: [
+            ws.subscribe('table0', nop),
+            ws.send({'op': 'subscribe', 'args': ['table1']}),
+            ws.subscribe('table2', nop),
+            ws.send(['not', 'a', 'command'])])
+        self.on_loop(ws, lambda: ws.send({'op': 'a'}))  # writer is alive
+        self.assertEqual(server.received[:3], [
+            '{"op": "subscribe", "args": ["table0"]}',
+            '{"op": "subscribe", "args": ["table1"]}',
+            '{"op": "subscribe", "args": ["table2"]}'])
+        self.assertEqual(server.received[-1], '{"op": "a"}')
+
+        server, ws = self.connect(BINANCE, fw.Binance.Websocket, '/ws')
+        self.quiet(ws)
+        self.on_loop(ws, lambda: [
+            ws.send({'method': 'SUBSCRIBE', 'id': 0, 'params': ['a@trade']}),
+            ws.subscribe('b@trade', nop)])
+        time.sleep(1 / ws.SEND_RATE_LIMIT)
+        msgs = self.commands(server, 'method')
+        self.assertEqual([m['params'] for m in msgs],
+                         [['a@trade'], ['b@trade']])
+
+    def test_priority(self):
+        server, ws = self.connect(BITMEX, fw.Bitmex.Websocket)
+        self.quiet(ws)
+        self.on_loop(ws, lambda: [
+            ws.send({'op': 'a'}),
+            ws.send_raw('{"op": "b"}'),
+            ws.send({'op': 'c'}, priority=True)])
+        ops = [m['op'] for m in self.commands(server, 'op')]
+        self.assertEqual(ops, ['c', 'a', 'b'])
+
+
+if __name__ == "__main__":
+    unittest.main()
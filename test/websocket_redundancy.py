@@ -0,0 +1,126 @@
+import json
+import unittest
+
+import botfw as fw
+
+from mock_helper import set_markets
+
+
+class OfflineBitflyerWebsocket(fw.Bitflyer.Websocket):
+    OFFLINE = True
+
+
+class OfflineBitmexWebsocket(fw.Bitmex.Websocket):
+    OFFLINE = True
+
+
+class OfflineBybitWebsocket(fw.Bybit.Websocket):
+    OFFLINE = True
+
+
+def frame(ch, message):
+    return json.dumps({'jsonrpc': '2.0', 'method': 'channelMessage',
+                       'params': {'channel': ch, 'message': message}})
+
+
+def board(price, size):
+    return frame('lightning_board_FX_BTC_JPY', {
+        'mid_price': price, 'bids': [{'price': price, 'size': size}],
+        'asks': []})
+
+
+class TestWebsocketRedundancy(unittest.TestCase):
+    '''test class of WebsocketBase.set_redundancy'''
+
+    def setUp(self):
+        set_markets(fw.Bitflyer.Api, {'FX_BTC_JPY': 'FX_BTC_JPY'})
+        self.ws = OfflineBitflyerWebsocket()
+        self.ws.set_redundancy(2)
+        self.replica = self.ws._replicas[0]
+        for ws in (self.ws, self.replica):
+            ws._on_open()
+        self.ob = fw.Bitflyer.Orderbook('FX_BTC_JPY', self.ws)
+        self.n = [0]
+        self.ob.add_callback(lambda: self.n.__setitem__(0, self.n[0] + 1))
+
+    def test_repeated_diff(self):
+        # the same diff text comes back when a level goes A -> B -> A
+        for size in (0.1, 0, 0.1):
+            self.ws._on_message(board(99, size))
+            self.replica._on_message(board(99, size))
+        self.assertEqual(self.n[0], 3)
+        self.assertEqual(list(self.ob.bids()), [[99, 0.1]])
+
+    def test_failover(self):
+        self.replica._on_message(board(99, 0.1))  # primary is active
+        self.assertEqual(self.n[0], 0)
+        self.ws._on_close()
+        self.replica._on_message(board(98, 0.2))
+        self.assertEqual(list(self.ob.bids()), [[98, 0.2]])
+
+    def test_message_id(self):
+        ch = 'lightning_executions_FX_BTC_JPY'
+        trades = []
+        self.ws.subscribe(ch, trades.append)
+        for i in (1, 2, 2, 3):
+            execution = [{'id': i, 'side': 'BUY', 'price': 100, 'size': 1}]
+            self.replica._on_message(frame(ch, execution))
+            self.ws._on_message(frame(ch, execution))
+        self.assertEqual(
+            [m['params']['message'][0]['id'] for m in trades], [1, 2, 3])
+
+
+class TestTradeDeduplication(unittest.TestCase):
+    '''trades of redundant connections are delivered by first arrival'''
+
+    def redundant(self, cls):
+        ws = cls()
+        ws.set_redundancy(2)
+        for w in [ws] + ws._replicas:
+            w._on_open()
+        return ws, ws._replicas[0]
+
+    def deliver(self, ws, replica, ch, frames):
+        msgs = []
+        ws.subscribe(ch, msgs.append)
+        for f in frames:
+            replica._on_message(f)
+            ws._on_message(f)
+        return msgs
+
+    def test_bitmex(self):
+        def trade(id_, action='insert'):
+            return json.dumps({'table': 'trade', 'action': action, 'data': [
+                {'symbol': 'XBTUSD', 'trdMatchID': id_}]})
+
+        ws, replica = self.redundant(OfflineBitmexWebsocket)
+        frames = [trade('a', 'partial'), trade('a'), trade('b'), trade('b'),
+                  trade('c')]
+        msgs = self.deliver(ws, replica, 'trade:XBTUSD', frames)
+        self.assertEqual(
+            [(m['action'], m['data'][0]['trdMatchID']) for m in msgs],
+            [('partial', 'a'), ('insert', 'a'), ('insert', 'b'),
+             ('insert', 'c')])
+
+    def test_bybit(self):
+        def trade(id_):
+            return json.dumps({'topic': 'trade.BTCUSD',
+                               'data': [{'trade_id': id_}]})
+
+        ws, replica = self.redundant(OfflineBybitWebsocket)
+        frames = [trade('a'), trade('b'), trade('b'), trade('c')]
+        msgs = self.deliver(ws, replica, 'trade.BTCUSD', frames)
+        self.assertEqual(
+            [m['data'][0]['trade_id'] for m in msgs], ['a', 'b', 'c'])
+
+    def test_not_replicable(self):
+        class Websocket(OfflineBitflyerWebsocket):
+            def __init__(self, loop=None):
+                super().__init__(loop=loop)
+
+        with self.assertRaises(Exception):
+            Websocket().set_redundancy(2)
+
+
+if __name__ == "__main__":
+    unittest.main()